@@ -0,0 +1,126 @@
+import json
+import platform
+import random
+import subprocess
+import time
+import timeit
+import numpy as np
+import neat # type: ignore
+from datetime import datetime
+from typing import Callable, List
+from cars.ray_sensors import COMPILED_RAY_CASTING
+from map_scripts.map_registry import get_map
+from map_scripts.map_tools import get_map_names
+from neat_training import NON_RAY_INPUTS
+from simulation.headless_simulation import HeadlessSimulation
+from simulation.simulation_setup import setup_generation
+
+# python cli.py benchmark
+# python -m benchmarks.simulation_benchmark
+
+NEAT_CONFIG_PATH = "config"
+SEED = 0
+POPULATION_SIZE = 150
+RAY_COUNT = 8
+REPEATS = 5
+STEP_BATCHES = 20
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+def create_genomes(config: neat.Config, population_size: int, seed: int = SEED) -> List[tuple[int, neat.DefaultGenome]]:
+    random.seed(seed)
+    config.pop_size = population_size
+    return list(neat.Population(config).population.items())
+
+def create_engine(map_name: str, genomes: List[tuple[int, neat.DefaultGenome]], config: neat.Config, seed: int = SEED) -> HeadlessSimulation:
+    random.seed(seed)
+    cars, walls, gates = setup_generation(map_name=map_name, genomes=genomes, config=config, ray_count=RAY_COUNT, random_angle=False)
+    return HeadlessSimulation(cars, walls, gates, 1, config, infinite_time=False, ray_sensors=get_map(map_name).ray_sensors)
+
+def time_ms(function: Callable[[], object], repeats: int, number: int = 1) -> dict[str, float]:
+    times: List[float] = [elapsed / number * 1000 for elapsed in timeit.repeat(function, number=number, repeat=repeats)]
+    return {"min_ms": min(times), "mean_ms": sum(times) / len(times)}
+
+def benchmark_map(map_name: str, config: neat.Config, population_size: int, repeats: int) -> dict[str, dict[str, float]]:
+    '''
+    Times every phase of simulation_step for a fresh generation on the map, then one whole headless generation.
+    '''
+    genomes = create_genomes(config, population_size)
+    engine: HeadlessSimulation = create_engine(map_name, genomes, config)
+    population = engine.population
+    alive: np.ndarray = population.alive_indices()
+
+    results: dict[str, dict[str, float]] = {}
+    results["ray_casting"] = time_ms(lambda: engine.ray_sensors.sense(population, alive), repeats, STEP_BATCHES)
+    results["network_activation"] = time_ms(lambda: population.desired_movements(alive), repeats, STEP_BATCHES)
+
+    def gate_checks() -> None:
+        positions = population.positions[alive]
+        candidates, directions = engine.gate_geometry.next_gates(population.last_gates[alive], population.directions[alive])
+        sides = engine.gate_geometry.sides_of_next_gates(candidates, positions)
+        engine.gate_geometry.crossed_gates(candidates, directions, sides, positions)
+    results["gate_checks"] = time_ms(gate_checks, repeats, STEP_BATCHES)
+
+    outputs: np.ndarray = population.desired_movements(alive)
+    def car_stepping() -> None:
+        population.accelerate(alive, outputs[:, 0])
+        population.steer(alive, outputs[:, 1])
+        population.move(alive)
+    results["car_stepping"] = time_ms(car_stepping, repeats, STEP_BATCHES)
+    engine.end_simulation()
+
+    frames: List[int] = []
+    def full_generation() -> None:
+        simulation: HeadlessSimulation = create_engine(map_name, genomes, config)
+        simulation.simulation_loop()
+        frames.append(simulation.frames)
+    results["full_generation"] = time_ms(full_generation, repeats)
+    results["full_generation"]["frames"] = frames[-1]
+
+    return results
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(map_names: List[str] | None = None, population_size: int = POPULATION_SIZE, repeats: int = REPEATS) -> dict:
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                                neat.DefaultStagnation, NEAT_CONFIG_PATH)
+    config.genome_config.num_inputs = RAY_COUNT + NON_RAY_INPUTS
+
+    maps: dict[str, dict[str, dict[str, float]]] = {}
+    for map_name in sorted(map_names or get_map_names()):
+        maps[map_name] = benchmark_map(map_name, config, population_size, repeats)
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "compiled_ray_casting": COMPILED_RAY_CASTING,
+        "seed": SEED,
+        "population_size": population_size,
+        "ray_count": RAY_COUNT,
+        "repeats": repeats,
+        "maps": maps,
+    }
+
+def write_results(results: dict, filename: str = DEFAULT_OUTPUT) -> None:
+    with open(filename, "w") as file:
+        json.dump(results, file, indent=2)
+
+def format_results(results: dict) -> List[str]:
+    lines: List[str] = []
+    for map_name, benchmarks in results["maps"].items():
+        lines.append(map_name)
+        for name, timing in benchmarks.items():
+            lines.append(f"    {name}: {timing['min_ms']:.3f} ms (mean {timing['mean_ms']:.3f} ms)")
+    return lines
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    results = run_benchmarks()
+    write_results(results)
+    print("\n".join(format_results(results)))
+    print(f"Written to {DEFAULT_OUTPUT} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,86 @@
+import math
+import random
+import timeit
+import numpy as np
+from typing import List
+from cars.car import HumanCar
+from cars.car_population import CarPopulation
+from cars.ray_sensors import RaySensorEngine
+from map_scripts.map import Wall
+from map_scripts.wall_grid import WallGrid
+from simulation.processing_functions import Quadratic
+
+# python -m benchmarks.wall_grid_benchmark
+
+SEED = 0
+CAR_COUNT = 150
+RAY_COUNT = 8
+RAY_LENGTH = 200
+SEGMENTS_PER_LOOP = 400
+OBSTACLE_COUNT = 200
+REPEATS = 20
+
+def generate_large_map(segments_per_loop: int = SEGMENTS_PER_LOOP, obstacle_count: int = OBSTACLE_COUNT, seed: int = SEED) -> List[Wall]:
+    '''
+    A wobbly ring track made of two closed polylines plus short obstacles scattered over the map.
+    '''
+    rng = random.Random(seed)
+    walls: List[Wall] = []
+
+    for radius in (420, 250):
+        points = []
+        for i in range(segments_per_loop):
+            angle = 2 * math.pi * i / segments_per_loop
+            wobble = 15 * math.sin(7 * angle)
+            points.append((640 + (radius + wobble) * 1.4 * math.cos(angle), 480 + (radius + wobble) * math.sin(angle)))
+        for start, end in zip(points, points[1:] + points[:1]):
+            walls.append(Wall(*start, *end))
+
+    for _ in range(obstacle_count):
+        x, y = rng.uniform(0, 1280), rng.uniform(0, 960)
+        angle = rng.uniform(0, 2 * math.pi)
+        walls.append(Wall(x, y, x + 20 * math.cos(angle), y + 20 * math.sin(angle)))
+
+    return walls
+
+def spawn_cars(count: int = CAR_COUNT, seed: int = SEED) -> CarPopulation:
+    rng = random.Random(seed)
+    cars = []
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        radius = rng.uniform(260, 410)
+        car = HumanCar(640 + radius * 1.4 * math.cos(angle), 480 + radius * math.sin(angle), rng.uniform(-180, 180))
+        car.generate_rays(RAY_COUNT, RAY_LENGTH, Quadratic)
+        cars.append(car)
+    return CarPopulation(cars)
+
+def run_benchmark() -> dict[str, float]:
+    walls = generate_large_map()
+    population = spawn_cars()
+    indices = population.alive_indices()
+
+    indexed_engine = RaySensorEngine(walls)
+    if indexed_engine.wall_grid is None:
+        indexed_engine.wall_grid = WallGrid(indexed_engine.wall_starts, indexed_engine.wall_ends)
+    brute_force_engine = RaySensorEngine(walls)
+    brute_force_engine.wall_grid = None
+
+    brute_force_time = min(timeit.repeat(lambda: brute_force_engine.sense(population, indices), number=1, repeat=REPEATS))
+    brute_force_distances = population.ray_distances.copy()
+
+    indexed_time = min(timeit.repeat(lambda: indexed_engine.sense(population, indices), number=1, repeat=REPEATS))
+    indexed_distances = population.ray_distances.copy()
+
+    return {
+        "walls": len(walls),
+        "cars": population.size,
+        "rays_per_car": population.ray_count,
+        "brute_force_ms": brute_force_time * 1000,
+        "indexed_ms": indexed_time * 1000,
+        "speedup": brute_force_time / indexed_time,
+        "max_distance_difference": float(np.abs(brute_force_distances - indexed_distances).max()),
+    }
+
+if __name__ == "__main__":
+    for name, value in run_benchmark().items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
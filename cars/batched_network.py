@@ -0,0 +1,112 @@
+import numpy as np
+from typing import List, Sequence
+from neat.activations import sigmoid_activation # type: ignore
+from neat.aggregations import sum_aggregation # type: ignore
+from neat.nn import FeedForwardNetwork # type: ignore
+
+def is_batchable(network: FeedForwardNetwork) -> bool:
+    '''
+    The batched plan implements sigmoid activation with sum aggregation, which is all the config allows.
+    '''
+    return all(act_func is sigmoid_activation and agg_func is sum_aggregation for _, act_func, agg_func, _, _, _ in network.node_evals)
+
+def sigmoid(z: np.ndarray) -> np.ndarray:
+    # same clamping as neat.activations.sigmoid_activation
+    return 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0)))
+
+def node_layers(network: FeedForwardNetwork) -> List[List[int]]:
+    '''
+    Groups the positions in network.node_evals into layers whose nodes only depend on earlier layers.
+    '''
+    depths: dict[int, int] = {key: 0 for key in network.input_nodes}
+    layers: List[List[int]] = []
+    for position, (node, _, _, _, _, links) in enumerate(network.node_evals):
+        depth = 1 + max([depths.get(source, 0) for source, _ in links] + [0])
+        depths[node] = depth
+        while len(layers) < depth:
+            layers.append([])
+        layers[depth - 1].append(position)
+    return layers
+
+class BatchedNetworks:
+    '''
+    Evaluation plan for many FeedForwardNetworks at once.
+
+    Every network's node values live in a row of a (networks, slots) matrix. The inputs
+    take the first slots, then each evaluated node gets its own slot. Nodes are grouped
+    into feed-forward layers and the layers are padded to the same size, so step k
+    computes the whole k-th layer of every network with a single gather, weighted sum
+    and sigmoid. Padding reads from an always zero slot and writes to a scratch slot.
+    '''
+    def __init__(self, networks: Sequence[FeedForwardNetwork]) -> None:
+        self.network_count: int = len(networks)
+        self.input_count: int = len(networks[0].input_nodes) if networks else 0
+        self.output_count: int = len(networks[0].output_nodes) if networks else 0
+
+        node_slots: List[dict[int, int]] = []
+        network_layers: List[List[List[int]]] = []
+        for network in networks:
+            if len(network.input_nodes) != self.input_count or len(network.output_nodes) != self.output_count:
+                raise ValueError("All networks must have the same number of inputs and outputs")
+            slots = {key: slot for slot, key in enumerate(network.input_nodes)}
+            for node, *_ in network.node_evals:
+                slots.setdefault(node, len(slots))
+            for node in network.output_nodes:
+                slots.setdefault(node, len(slots))
+            node_slots.append(slots)
+            network_layers.append(node_layers(network))
+
+        slot_count: int = max([len(slots) for slots in node_slots] + [self.input_count])
+        self.zero_slot: int = slot_count
+        self.scratch_slot: int = slot_count + 1
+        self.slot_count: int = slot_count + 2
+
+        step_count: int = max([len(layers) for layers in network_layers] + [0])
+        layer_width: int = max([len(layer) for layers in network_layers for layer in layers] + [1])
+        link_count: int = max([len(links) for network in networks for *_, links in network.node_evals] + [1])
+
+        shape = (self.network_count, step_count, layer_width)
+        self.targets: np.ndarray = np.full(shape, self.scratch_slot, dtype=np.int64)
+        self.sources: np.ndarray = np.full(shape + (link_count,), self.zero_slot, dtype=np.int64)
+        self.weights: np.ndarray = np.zeros(shape + (link_count,), dtype=np.float64)
+        self.biases: np.ndarray = np.zeros(shape, dtype=np.float64)
+        self.responses: np.ndarray = np.zeros(shape, dtype=np.float64)
+        self.outputs: np.ndarray = np.zeros((self.network_count, self.output_count), dtype=np.int64)
+
+        for row, (network, slots, layers) in enumerate(zip(networks, node_slots, network_layers)):
+            for step, layer in enumerate(layers):
+                for column, position in enumerate(layer):
+                    node, _, _, bias, response, links = network.node_evals[position]
+                    self.targets[row, step, column] = slots[node]
+                    self.biases[row, step, column] = bias
+                    self.responses[row, step, column] = response
+                    for link, (source, weight) in enumerate(links):
+                        self.sources[row, step, column, link] = slots[source]
+                        self.weights[row, step, column, link] = weight
+            self.outputs[row] = [slots[node] for node in network.output_nodes]
+
+    @property
+    def step_count(self) -> int:
+        return self.targets.shape[1]
+
+    def activate(self, rows: np.ndarray, inputs: np.ndarray) -> np.ndarray:
+        '''
+        Activates the networks of the given rows, each with its own row of inputs.
+        Returns a (rows, outputs) array.
+        '''
+        count: int = len(rows)
+        values = np.zeros((count, self.slot_count), dtype=np.float64)
+        values[:, :self.input_count] = inputs
+
+        targets = self.targets[rows]
+        sources = self.sources[rows]
+        weights = self.weights[rows]
+        biases = self.biases[rows]
+        responses = self.responses[rows]
+        value_rows = np.arange(count)
+
+        for step in range(self.step_count):
+            sums = (values[value_rows[:, None, None], sources[:, step]] * weights[:, step]).sum(axis=2)
+            values[value_rows[:, None], targets[:, step]] = sigmoid(biases[:, step] + responses[:, step] * sums)
+
+        return values[value_rows[:, None], self.outputs[rows]]
@@ -2,19 +2,25 @@ import pygame as pg
 from pygame.key import ScancodeWrapper
 from pygame.math import Vector2
 import math
-from typing import List
+from typing import List, TYPE_CHECKING
 import os
 from abc import ABC, abstractmethod
 from neat import DefaultGenome
 from cars.car_ray import CarRay
+from cars.car_sprites import CarSpriteAtlas
 from neat.nn import FeedForwardNetwork
 from map_scripts.map import Gate
 
+if TYPE_CHECKING:
+    from cars.car_population import CarPopulation
+
 CAR_IMG = pg.image.load(os.path.join("imgs", "car_img.png"))
 
 CAR_WIDTH = CAR_IMG.get_width()
 CAR_HEIGHT = CAR_IMG.get_height()
 
+CAR_SPRITES = CarSpriteAtlas(CAR_IMG)
+
 RAY_DISTANCE_KILL = 10
 
 WHEEL_TURN = 60
@@ -23,16 +29,113 @@ WHEEL_TURN_SPEED = 3
 ACCELERATION = 0.3
 BACK_ACCELERATION_MULTIPLIER = 0.3
 
+SPEED_DAMPING = 0.94
+
+def draw_car_image(win, x: float, y: float, angle: float) -> pg.Rect:
+    '''
+    Draws the car image with its unrotated top left corner at (x, y) and returns the area it covers.
+    '''
+    return CAR_SPRITES.draw_one(win, x, y, angle)
+
 class Car(ABC):
     def __init__(self, x, y, starting_angle: float) -> None:
-        self.position = Vector2(x, y)
-        self.angle: float = starting_angle
-        self._speed = 0
+        self._population: "CarPopulation | None" = None
+        self.population_index: int = -1
+        self._position = Vector2(x, y)
+        self._angle: float = starting_angle
+        self._speed: float = 0
+        self._last_gate: int = 0
+        self._direction: int = 0
         self.rays: List[CarRay] = []
-        self.last_gate: int
-        self.direction: int = 0
         self.rect: pg.Rect = pg.Rect(x, y, CAR_WIDTH, CAR_HEIGHT)
         
+    def bind(self, population: "CarPopulation", index: int) -> None:
+        '''
+        Makes this car a view of the given row of a CarPopulation.
+        '''
+        self._population = population
+        self.population_index = index
+        
+    def unbind(self) -> None:
+        if self._population is None:
+            return
+        self._position = self.position
+        self._angle = self.angle
+        self._speed = self.speed
+        self._last_gate = self.last_gate
+        self._direction = self.direction
+        self._population = None
+        self.population_index = -1
+        
+    @property
+    def position(self) -> Vector2:
+        '''
+        A copy of the population row when bound, so assign instead of mutating in place.
+        '''
+        if self._population is None:
+            return self._position
+        x, y = self._population.positions[self.population_index]
+        return Vector2(x, y)
+    
+    @position.setter
+    def position(self, position: Vector2) -> None:
+        if self._population is None:
+            self._position = Vector2(position)
+        else:
+            self._population.positions[self.population_index] = (position[0], position[1])
+            
+    @property
+    def angle(self) -> float:
+        if self._population is None:
+            return self._angle
+        return float(self._population.angles[self.population_index])
+    
+    @angle.setter
+    def angle(self, angle: float) -> None:
+        if self._population is None:
+            self._angle = angle
+        else:
+            self._population.angles[self.population_index] = angle
+            
+    @property
+    def speed(self) -> float:
+        if self._population is None:
+            return self._speed
+        return float(self._population.speeds[self.population_index])
+    
+    @speed.setter
+    def speed(self, speed: float) -> None:
+        if self._population is None:
+            self._speed = speed
+        else:
+            self._population.speeds[self.population_index] = speed
+            
+    @property
+    def last_gate(self) -> int:
+        if self._population is None:
+            return self._last_gate
+        return int(self._population.last_gates[self.population_index])
+    
+    @last_gate.setter
+    def last_gate(self, last_gate: int) -> None:
+        if self._population is None:
+            self._last_gate = last_gate
+        else:
+            self._population.last_gates[self.population_index] = last_gate
+            
+    @property
+    def direction(self) -> int:
+        if self._population is None:
+            return self._direction
+        return int(self._population.directions[self.population_index])
+    
+    @direction.setter
+    def direction(self, direction: int) -> None:
+        if self._population is None:
+            self._direction = direction
+        else:
+            self._population.directions[self.population_index] = direction
+        
     def _next_gate_index(self, gates: list[Gate]) -> int:
         return ((self.last_gate) + self.direction) % len(gates)
     
@@ -102,6 +205,10 @@ class Car(ABC):
     @abstractmethod            
     def get_score(self) -> float:
         ...
+        
+    @abstractmethod            
+    def set_score(self, score: float) -> None:
+        ...
     
     def check_if_hit_wall(self):
         if min([line.last_distance for line in self.rays]) < RAY_DISTANCE_KILL:
@@ -110,6 +217,12 @@ class Car(ABC):
     @abstractmethod
     def get_desired_movement(self) -> Vector2:
         ...
+        
+    def get_desired_movement_from_inputs(self, inputs: List[float]) -> Vector2:
+        '''
+        Used when the sensor inputs were already gathered for the whole population.
+        '''
+        return self.get_desired_movement()
 
     def get_centre_position(self):
         return self.position + Vector2(CAR_WIDTH / 2, CAR_HEIGHT / 2)
@@ -117,33 +230,33 @@ class Car(ABC):
     def move_forward(self, force):
         normalized_force = force * 2 - 1
 
-        self._speed += normalized_force * ACCELERATION * (1 if force >= 0 else BACK_ACCELERATION_MULTIPLIER)
+        self.speed += normalized_force * ACCELERATION * (1 if force >= 0 else BACK_ACCELERATION_MULTIPLIER)
 
     def generate_rays(self, ray_count, ray_length, processing_function) -> None:
         for i in range(0, 360, 360 // ray_count):
             self.rays.append(CarRay(self, i, ray_length, processing_function))
             
     def _calculate_wheel_turn_coefficient(self):
-        return math.sqrt(abs(self._speed))
+        return math.sqrt(abs(self.speed))
 
     def steer(self, way):
         wheel_turn_coefficient = self._calculate_wheel_turn_coefficient()
 
         if way < 0.5:
-            self.angle -= WHEEL_TURN_SPEED * (0.5 - way) * wheel_turn_coefficient * (1 if self._speed >= 0 else -1)
+            self.angle -= WHEEL_TURN_SPEED * (0.5 - way) * wheel_turn_coefficient * (1 if self.speed >= 0 else -1)
         if way > 0.5:
-            self.angle += WHEEL_TURN_SPEED * (way - 0.5) * wheel_turn_coefficient * (1 if self._speed >= 0 else -1)
+            self.angle += WHEEL_TURN_SPEED * (way - 0.5) * wheel_turn_coefficient * (1 if self.speed >= 0 else -1)
 
     def move(self):
-        self._speed *= 0.94
+        self.speed *= SPEED_DAMPING
 
         if self.angle < -180:
             self.angle += 360
         if self.angle > 180:
             self.angle -= 360
         
-        delta_y = -self._speed * math.cos(math.radians(self.angle))
-        delta_x = self._speed * math.sin(math.radians(self.angle))
+        delta_y = -self.speed * math.cos(math.radians(self.angle))
+        delta_x = self.speed * math.sin(math.radians(self.angle))
 
         self.position += Vector2(delta_x, delta_y)
 
@@ -151,9 +264,7 @@ class Car(ABC):
         ...
 
     def draw(self, win):
-        rotated_image = pg.transform.rotate(CAR_IMG, -self.angle)
-        self.rect = rotated_image.get_rect(center=CAR_IMG.get_rect(topleft=(self.position.x, self.position.y)).center)
-        win.blit(rotated_image, self.rect.topleft)
+        self.rect = draw_car_image(win, self.position.x, self.position.y, self.angle)
         
 class AICar(Car):    
     def __init__(self, *args) -> None:
@@ -164,14 +275,18 @@ class AICar(Car):
     def set_neural_net(self, neural_net):
         self._neural_net = neural_net
         
+    def get_neural_net(self) -> FeedForwardNetwork:
+        return self._neural_net
+        
     def set_geonme(self, genome):
         self._genome = genome
     
     def get_desired_movement(self) -> Vector2:      
-        inputs: List[float] = [ray.last_distance for ray in self.rays] + [self._speed, self._calculate_wheel_turn_coefficient()]
-        outputs = self._neural_net.activate(inputs)
-        
-        return outputs
+        inputs: List[float] = [ray.last_distance for ray in self.rays] + [self.speed, self._calculate_wheel_turn_coefficient()]
+        return self.get_desired_movement_from_inputs(inputs)
+    
+    def get_desired_movement_from_inputs(self, inputs: List[float]) -> Vector2:
+        return self._neural_net.activate(inputs)
     
     def reward(self, reward: float):
         self._genome.fitness += reward
@@ -179,6 +294,9 @@ class AICar(Car):
     def get_score(self):
         return self._genome.fitness
     
+    def set_score(self, score: float) -> None:
+        self._genome.fitness = score
+    
 class HumanCar(Car):
     def __init__(self, *args):
         super().__init__(*args)
@@ -205,4 +323,7 @@ class HumanCar(Car):
     
     def get_score(self) -> int:
         return self._score
+    
+    def set_score(self, score: float) -> None:
+        self._score = score
         
\ No newline at end of file
@@ -0,0 +1,144 @@
+import numpy as np
+from typing import List, Sequence
+from cars.batched_network import BatchedNetworks, is_batchable
+from cars.car import Car, AICar, CAR_WIDTH, CAR_HEIGHT, ACCELERATION, BACK_ACCELERATION_MULTIPLIER, WHEEL_TURN_SPEED, SPEED_DAMPING
+
+CAR_CENTRE_OFFSET = np.array([CAR_WIDTH / 2, CAR_HEIGHT / 2], dtype=np.float64)
+
+class CarPopulation:
+    '''
+    Structure-of-arrays state of every car in a generation.
+
+    The cars passed in become thin views of their rows (see Car.bind), so drawing,
+    gate checks and the human test drive keep working on Car objects, while the
+    simulation steps the kinematics of the whole population at once.
+    Scores are accumulated in `fitness` and stored back into the cars (and so into
+    their genomes) when they die or when the population is released.
+    '''
+    def __init__(self, cars: Sequence[Car]) -> None:
+        self.cars: List[Car] = list(cars)
+        count: int = len(self.cars)
+
+        ray_counts: set[int] = {len(car.rays) for car in self.cars}
+        if len(ray_counts) > 1:
+            raise ValueError("All cars in a population must have the same number of rays")
+        ray_count: int = ray_counts.pop() if ray_counts else 0
+
+        self.positions: np.ndarray = np.array([(car.position.x, car.position.y) for car in self.cars], dtype=np.float64).reshape(count, 2)
+        self.angles: np.ndarray = np.array([car.angle for car in self.cars], dtype=np.float64)
+        self.speeds: np.ndarray = np.array([car.speed for car in self.cars], dtype=np.float64)
+        self.alive: np.ndarray = np.ones(count, dtype=bool)
+        self.last_gates: np.ndarray = np.array([car.last_gate for car in self.cars], dtype=np.int64)
+        self.directions: np.ndarray = np.array([car.direction for car in self.cars], dtype=np.int64)
+        self.fitness: np.ndarray = np.array([car.get_score() for car in self.cars], dtype=np.float64)
+
+        self.ray_angle_biases: np.ndarray = np.array([[ray.angle_bias for ray in car.rays] for car in self.cars], dtype=np.float64).reshape(count, ray_count)
+        self.ray_lengths: np.ndarray = np.array([[ray.length for ray in car.rays] for car in self.cars], dtype=np.float64).reshape(count, ray_count)
+        self.ray_distances: np.ndarray = np.zeros((count, ray_count), dtype=np.float64)
+        self.ray_points: np.ndarray = np.full((count, ray_count, 2), np.nan, dtype=np.float64)
+        self.ray_hits: np.ndarray = np.zeros((count, ray_count), dtype=bool)
+
+        self.network_rows: np.ndarray = np.full(count, -1, dtype=np.int64)
+        networks = []
+        for index, car in enumerate(self.cars):
+            if isinstance(car, AICar) and is_batchable(car.get_neural_net()):
+                self.network_rows[index] = len(networks)
+                networks.append(car.get_neural_net())
+        self.networks: BatchedNetworks | None = BatchedNetworks(networks) if networks else None
+
+        for index, car in enumerate(self.cars):
+            car.bind(self, index)
+
+    @property
+    def size(self) -> int:
+        return len(self.cars)
+
+    @property
+    def ray_count(self) -> int:
+        return self.ray_lengths.shape[1]
+
+    def alive_indices(self) -> np.ndarray:
+        return np.flatnonzero(self.alive)
+
+    def alive_cars(self) -> List[Car]:
+        return [self.cars[index] for index in self.alive_indices().tolist()]
+
+    def centre_positions(self, indices: np.ndarray) -> np.ndarray:
+        return self.positions[indices] + CAR_CENTRE_OFFSET
+
+    def shortest_ray_distances(self, indices: np.ndarray) -> np.ndarray:
+        if self.ray_count == 0:
+            return np.full(len(indices), np.inf)
+        return self.ray_distances[indices].min(axis=1)
+
+    def network_inputs(self, indices: np.ndarray) -> np.ndarray:
+        speeds = self.speeds[indices, None]
+        return np.hstack((self.ray_distances[indices], speeds, np.sqrt(np.abs(speeds))))
+
+    def desired_movements(self, indices: np.ndarray) -> np.ndarray:
+        '''
+        Networks compiled into the batched plan are evaluated together, every other car decides on its own.
+        '''
+        inputs: np.ndarray = self.network_inputs(indices)
+        outputs = np.zeros((len(indices), 2), dtype=np.float64)
+
+        network_rows = self.network_rows[indices]
+        batched = network_rows >= 0
+        if self.networks is not None and batched.any():
+            outputs[batched] = self.networks.activate(network_rows[batched], inputs[batched])
+
+        for position in np.flatnonzero(~batched).tolist():
+            car = self.cars[indices[position]]
+            outputs[position] = tuple(car.get_desired_movement_from_inputs(inputs[position].tolist()))
+
+        return outputs
+
+    def accelerate(self, indices: np.ndarray, forces: np.ndarray) -> None:
+        '''
+        Batched Car.move_forward.
+        '''
+        multipliers = np.where(forces >= 0, 1, BACK_ACCELERATION_MULTIPLIER)
+        self.speeds[indices] += (forces * 2 - 1) * ACCELERATION * multipliers
+
+    def steer(self, indices: np.ndarray, ways: np.ndarray) -> None:
+        '''
+        Batched Car.steer.
+        '''
+        speeds = self.speeds[indices]
+        wheel_turn_coefficients = np.sqrt(np.abs(speeds))
+        self.angles[indices] += WHEEL_TURN_SPEED * (ways - 0.5) * wheel_turn_coefficients * np.where(speeds >= 0, 1, -1)
+
+    def move(self, indices: np.ndarray) -> None:
+        '''
+        Batched Car.move.
+        '''
+        speeds = self.speeds[indices] * SPEED_DAMPING
+        self.speeds[indices] = speeds
+
+        angles = self.angles[indices]
+        angles = np.where(angles < -180, angles + 360, angles)
+        angles = np.where(angles > 180, angles - 360, angles)
+        self.angles[indices] = angles
+
+        radians = np.radians(angles)
+        self.positions[indices, 0] += speeds * np.sin(radians)
+        self.positions[indices, 1] += -speeds * np.cos(radians)
+
+    def reward(self, indices: np.ndarray, rewards: np.ndarray | float) -> None:
+        self.fitness[indices] += rewards
+
+    def kill(self, indices: np.ndarray) -> None:
+        self.alive[indices] = False
+        self.store_scores(indices)
+
+    def store_scores(self, indices: np.ndarray) -> None:
+        for index, score in zip(indices.tolist(), self.fitness[indices].tolist()):
+            self.cars[index].set_score(score)
+
+    def release(self) -> None:
+        '''
+        Stores every score and turns the cars back into standalone objects.
+        '''
+        self.store_scores(np.arange(self.size))
+        for car in self.cars:
+            car.unbind()
@@ -3,7 +3,6 @@ from pygame.math import Vector2
 from typing import List, Callable
 import vector_math
 from map_scripts.map import Wall
-from pygame_extensions.pygame_tools import lerp_color, aaline
 
 CLOSE_COLOR = pg.Color(193, 0, 0, 255)
 FAR_COLOR = pg.Color(0, 0, 0, 0)
@@ -48,12 +47,6 @@ class CarRay:
             self.length)
         return intersection_point, closest_distance
     
-    def draw_debug(self, win) -> None:      
-        aaline(win, self.get_debug_color(), self.get_origin_position(), self.last_point if self.last_point is not None else self.get_end_position(), RAY_WIDTH)
-    
-    def get_debug_color(self) -> pg.Color:    
-        return lerp_color(CLOSE_COLOR, FAR_COLOR, self.processed_last_distance)
-
     def set_last_distance(self, distance: float) -> None:
         self.last_distance = distance
         self.processed_last_distance = self.processing_function(distance, self.length)
@@ -0,0 +1,72 @@
+import math
+import numpy as np
+import pygame as pg
+from pygame.surface import Surface
+from typing import List
+
+DEFAULT_ANGLE_STEP: float = 1
+ATLAS_COLUMNS: int = 30
+
+class CarSpriteAtlas:
+    '''
+    The car image rotated to every multiple of angle_step degrees, packed into one surface when first drawn.
+    Drawing looks up the nearest rotation instead of rotating the image for every car on every frame,
+    and a whole population is drawn with a single Surface.blits call.
+    '''
+    def __init__(self, image: Surface, angle_step: float = DEFAULT_ANGLE_STEP) -> None:
+        if angle_step <= 0 or angle_step > 360:
+            raise ValueError("Angle step has to be in (0, 360] degrees")
+        self.image: Surface = image
+        self.rotation_count: int = max(1, round(360 / angle_step))
+        self.angle_step: float = 360 / self.rotation_count
+
+        self.atlas: Surface | None = None
+        self.areas: List[pg.Rect] = []
+        # top left corner of each rotation relative to the top left corner of the unrotated image
+        self.offsets: np.ndarray = np.zeros((self.rotation_count, 2), dtype=np.float64)
+        self.sizes: np.ndarray = np.zeros((self.rotation_count, 2), dtype=np.int64)
+
+    def build(self) -> None:
+        image: Surface = self.image.convert_alpha() if pg.display.get_surface() is not None else self.image
+        rotations: List[Surface] = [pg.transform.rotate(image, -index * self.angle_step) for index in range(self.rotation_count)]
+
+        cell_width: int = max(rotation.get_width() for rotation in rotations)
+        cell_height: int = max(rotation.get_height() for rotation in rotations)
+        columns: int = min(ATLAS_COLUMNS, self.rotation_count)
+        rows: int = math.ceil(self.rotation_count / columns)
+
+        atlas = Surface((columns * cell_width, rows * cell_height), pg.SRCALPHA)
+        if pg.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        atlas.fill((0, 0, 0, 0))
+
+        image_centre = image.get_rect().center
+        self.areas = []
+        for index, rotation in enumerate(rotations):
+            cell = pg.Rect((index % columns) * cell_width, (index // columns) * cell_height, rotation.get_width(), rotation.get_height())
+            atlas.blit(rotation, cell.topleft)
+            self.areas.append(cell)
+            self.offsets[index] = rotation.get_rect(center=image_centre).topleft
+            self.sizes[index] = rotation.get_size()
+        self.atlas = atlas
+
+    def rotation_indices(self, angles: np.ndarray) -> np.ndarray:
+        return np.rint(np.asarray(angles, dtype=np.float64) / self.angle_step).astype(np.int64) % self.rotation_count
+
+    def draw(self, win: Surface, positions: np.ndarray, angles: np.ndarray) -> List[pg.Rect]:
+        '''
+        Draws cars with their unrotated top left corners at positions, returns the area each one covers.
+        '''
+        if self.atlas is None:
+            self.build()
+        if len(positions) == 0:
+            return []
+
+        indices: np.ndarray = self.rotation_indices(angles)
+        # the rotated image is centred on the unrotated one, and rounded down like Rect coordinates
+        destinations: List[List[int]] = np.floor(np.asarray(positions, dtype=np.float64).reshape(-1, 2) + self.offsets[indices]).astype(np.int64).tolist()
+        areas: List[pg.Rect] = self.areas
+        return win.blits([(self.atlas, destination, areas[index]) for destination, index in zip(destinations, indices.tolist())])
+
+    def draw_one(self, win: Surface, x: float, y: float, angle: float) -> pg.Rect:
+        return self.draw(win, np.array([[x, y]]), np.array([angle]))[0]
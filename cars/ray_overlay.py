@@ -0,0 +1,78 @@
+import numpy as np
+import pygame as pg
+from pygame.surface import Surface
+from typing import List
+from cars.car_population import CarPopulation
+from cars.car_ray import CLOSE_COLOR, FAR_COLOR, RAY_WIDTH
+from cars.ray_sensors import ray_end_positions
+
+RAY_COLOR_STEPS: int = 256
+
+def ray_color_table(close_color: pg.Color, far_color: pg.Color, steps: int = RAY_COLOR_STEPS) -> np.ndarray:
+    '''
+    Colours of rays whose processed distance is 0, 1 / (steps - 1), ..., 1, rounded down like lerp_color.
+    '''
+    t: np.ndarray = np.linspace(0, 1, steps)[:, None]
+    close = np.array(tuple(close_color), dtype=np.float64)
+    far = np.array(tuple(far_color), dtype=np.float64)
+    return (close + (far - close) * t).astype(np.uint8)
+
+class RayDebugOverlay:
+    '''
+    Draws the sensed rays of many cars in one pass, straight from the population arrays.
+
+    Rays are drawn as plain lines onto a transparent overlay, which is blitted onto the window once,
+    so the translucent far rays are blended with whatever is below them.
+    Their colour is looked up in a table by processed distance instead of being interpolated for every ray.
+    '''
+    def __init__(self, size: tuple[int, int], close_color: pg.Color = CLOSE_COLOR, far_color: pg.Color = FAR_COLOR,
+                 width: int = RAY_WIDTH, color_steps: int = RAY_COLOR_STEPS) -> None:
+        if color_steps < 2:
+            raise ValueError("The ray colour table needs at least two colours")
+        self.size: tuple[int, int] = size
+        self.width: int = width
+        self.colors: List[tuple[int, int, int, int]] = [tuple(color) for color in ray_color_table(close_color, far_color, color_steps).tolist()]
+        self.overlay: Surface | None = None
+        # the part of the overlay drawn on last time, cleared before drawing again
+        self.drawn_area: pg.Rect | None = None
+
+    def clear(self) -> None:
+        if self.overlay is None:
+            self.overlay = Surface(self.size, pg.SRCALPHA)
+            if pg.display.get_surface() is not None:
+                self.overlay = self.overlay.convert_alpha()
+            self.overlay.fill((0, 0, 0, 0))
+        elif self.drawn_area is not None:
+            self.overlay.fill((0, 0, 0, 0), self.drawn_area)
+        self.drawn_area = None
+
+    def draw(self, win: Surface, population: CarPopulation, indices: np.ndarray) -> pg.Rect | None:
+        '''
+        Draws the rays of the cars at the given population indices, returns the area that was drawn on.
+        '''
+        self.clear()
+        if len(indices) == 0 or population.ray_count == 0:
+            return None
+
+        origins: np.ndarray = population.centre_positions(indices)
+        lengths: np.ndarray = population.ray_lengths[indices]
+        # rays end at the wall they hit, otherwise at their full length
+        ends: np.ndarray = np.where(population.ray_hits[indices][..., None],
+                                    population.ray_points[indices],
+                                    ray_end_positions(origins, population.angles[indices], population.ray_angle_biases[indices], lengths))
+
+        processing_function = population.cars[int(indices[0])].rays[0].processing_function
+        processed: np.ndarray = np.clip(processing_function(population.ray_distances[indices], lengths), 0, 1)
+        color_indices: List[int] = np.rint(processed * (len(self.colors) - 1)).astype(np.int64).ravel().tolist()
+
+        starts: List[List[float]] = np.repeat(origins, population.ray_count, axis=0).tolist()
+        line_ends: List[List[float]] = ends.reshape(-1, 2).tolist()
+
+        overlay: Surface = self.overlay
+        colors = self.colors
+        width: int = self.width
+        line = pg.draw.line
+        rects: List[pg.Rect] = [line(overlay, colors[color], start, end, width) for start, end, color in zip(starts, line_ends, color_indices)]
+
+        self.drawn_area = rects[0].unionall(rects[1:]).clip(overlay.get_rect())
+        return win.blit(overlay, self.drawn_area.topleft, self.drawn_area)
@@ -0,0 +1,133 @@
+import numpy as np
+from typing import Sequence
+import vector_math # type: ignore
+from cars.car_population import CarPopulation
+from map_scripts.map import Wall, wall_arrays
+from map_scripts.wall_grid import WallGrid
+
+WALL_GRID_MIN_WALLS: int = 32
+
+# builds of vector_math older than the batch kernels fall back to NumPy
+COMPILED_RAY_CASTING: bool = hasattr(vector_math, "cast_rays_batch")
+
+def cast_rays_compiled(origins: np.ndarray, ends: np.ndarray, wall_starts: np.ndarray, wall_ends: np.ndarray, candidate_walls: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Same results as cast_rays, computed by the Cython kernels in vector_math without the GIL.
+    candidate_walls is an optional (cars, candidates) matrix from WallGrid.candidate_walls.
+    '''
+    car_count, ray_count = ends.shape[:2]
+    ray_origins = np.ascontiguousarray(np.repeat(origins, ray_count, axis=0))
+    ray_ends = np.ascontiguousarray(ends.reshape(-1, 2))
+
+    distances = np.empty(car_count * ray_count, dtype=np.float64)
+    points = np.empty((car_count * ray_count, 2), dtype=np.float64)
+    hits = np.empty(car_count * ray_count, dtype=np.uint8)
+
+    if candidate_walls is None:
+        vector_math.cast_rays_batch(ray_origins, ray_ends, wall_starts, wall_ends, distances, points, hits)
+    else:
+        vector_math.cast_rays_batch_indexed(ray_origins, ray_ends, wall_starts, wall_ends, np.ascontiguousarray(candidate_walls, dtype=np.int64), ray_count, distances, points, hits)
+
+    return distances.reshape(car_count, ray_count), points.reshape(car_count, ray_count, 2), hits.reshape(car_count, ray_count).astype(bool)
+
+def ray_end_positions(origins: np.ndarray, angles: np.ndarray, angle_biases: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    '''
+    Same geometry as CarRay.get_end_position, for a (cars, rays) grid of rays.
+    '''
+    ray_angles = np.radians(-angles[:, None] + angle_biases)
+    offsets = np.stack((lengths * np.sin(ray_angles), lengths * np.cos(ray_angles)), axis=-1)
+    return origins[:, None, :] + offsets
+
+def cast_rays(origins: np.ndarray, ends: np.ndarray, wall_starts: np.ndarray, wall_ends: np.ndarray, lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Intersects every ray with every wall in a single (cars, rays, walls) array operation.
+
+    origins: (cars, 2), ends: (cars, rays, 2), lengths: (cars, rays).
+    wall_starts/wall_ends: (walls, 2) shared by all cars, or (cars, walls, 2) per car.
+    Returns distances (cars, rays), hit points (cars, rays, 2) and a hit mask (cars, rays).
+    Distances of rays that hit nothing are their lengths and their points are NaN.
+    '''
+    if wall_starts.ndim == 2:
+        wall_starts = wall_starts[None]
+        wall_ends = wall_ends[None]
+
+    ray_vectors = ends - origins[:, None, :]
+    wall_vectors = wall_ends - wall_starts
+
+    s10_x = ray_vectors[..., 0, None]
+    s10_y = ray_vectors[..., 1, None]
+    s32_x = wall_vectors[:, None, :, 0]
+    s32_y = wall_vectors[:, None, :, 1]
+
+    s02_x = origins[:, None, None, 0] - wall_starts[:, None, :, 0]
+    s02_y = origins[:, None, None, 1] - wall_starts[:, None, :, 1]
+
+    denom = s10_x * s32_y - s32_x * s10_y
+    s_numer = s10_x * s02_y - s10_y * s02_x
+    t_numer = s32_x * s02_y - s32_y * s02_x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = s_numer / denom
+        t = t_numer / denom
+
+    intersects = (denom != 0) & (s >= 0) & (s <= 1) & (t >= 0) & (t <= 1)
+    t = np.where(intersects, t, np.inf)
+
+    if t.shape[-1] == 0:
+        closest_t = np.full(lengths.shape, np.inf)
+    else:
+        closest_t = t.min(axis=-1)
+    hits = np.isfinite(closest_t)
+
+    distances = np.where(hits, closest_t * lengths, lengths)
+    points = np.where(hits[..., None], origins[:, None, :] + np.where(hits, closest_t, 0)[..., None] * ray_vectors, np.nan)
+
+    return distances, points, hits
+
+class RaySensorEngine:
+    '''
+    Batched replacement for calling Car.calculate_line_distances_quick on every car.
+    Senses all rays of the given cars of a population against all walls at once.
+
+    Maps with many walls get a WallGrid, and each car is then only tested against
+    the walls in the grid cells its rays can reach.
+    '''
+    def __init__(self, walls: Sequence[Wall]) -> None:
+        self.wall_starts: np.ndarray
+        self.wall_ends: np.ndarray
+        self.wall_grid: WallGrid | None
+        self.set_walls(walls)
+
+    def set_walls(self, walls: Sequence[Wall]) -> None:
+        self.wall_starts, self.wall_ends = wall_arrays(walls)
+        self.wall_grid = WallGrid(self.wall_starts, self.wall_ends) if len(walls) >= WALL_GRID_MIN_WALLS else None
+
+        # candidate matrices are padded with -1, which selects this trailing zero-length wall that never intersects
+        self._padded_wall_starts: np.ndarray = np.vstack((self.wall_starts, np.zeros((1, 2))))
+        self._padded_wall_ends: np.ndarray = np.vstack((self.wall_ends, np.zeros((1, 2))))
+
+    def cast(self, origins: np.ndarray, ends: np.ndarray, lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self.wall_grid is None:
+            if COMPILED_RAY_CASTING:
+                return cast_rays_compiled(origins, ends, self.wall_starts, self.wall_ends)
+            return cast_rays(origins, ends, self.wall_starts, self.wall_ends, lengths)
+
+        candidates: np.ndarray = self.wall_grid.candidate_walls(origins, float(lengths.max()))
+        if COMPILED_RAY_CASTING:
+            return cast_rays_compiled(origins, ends, self.wall_starts, self.wall_ends, candidates)
+        return cast_rays(origins, ends, self._padded_wall_starts[candidates], self._padded_wall_ends[candidates], lengths)
+
+    def sense(self, population: CarPopulation, indices: np.ndarray) -> None:
+        if len(indices) == 0 or population.ray_count == 0:
+            return
+
+        origins = population.centre_positions(indices)
+        lengths = population.ray_lengths[indices]
+        ends = ray_end_positions(origins, population.angles[indices], population.ray_angle_biases[indices], lengths)
+
+        distances, points, hits = self.cast(origins, ends, lengths)
+
+        # rounding must not push a distance past the ray length, misses report exactly the length like CarRay does
+        population.ray_distances[indices] = np.where(hits, np.minimum(distances, lengths), lengths)
+        population.ray_points[indices] = points
+        population.ray_hits[indices] = hits
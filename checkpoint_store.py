@@ -0,0 +1,373 @@
+import gzip
+import json
+import logging
+import lzma
+import os
+import pickle
+import queue
+import random
+import re
+import sys
+import threading
+import neat # type: ignore
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from run_manifest import RunManifest, MANIFEST_FILENAME_END
+
+CHECKPOINT_FOLDER: str = "checkpoints"
+INDEX_FILENAME: str = "index.json"
+INDEX_VERSION: int = 1
+
+CHECKPOINT_NAME_PATTERN: str = r'\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}-NEAT-(\d+)$'
+
+COMPRESSIONS: Dict[str, tuple[str, Callable[..., Any]]] = {
+    "gzip": (".gz", gzip.open),
+    "lzma": (".xz", lzma.open),
+}
+DEFAULT_COMPRESSION: str = "gzip"
+
+DEFAULT_WRITER_QUEUE_SIZE: int = 2
+
+logger = logging.getLogger(__name__)
+
+def checkpoint_name(filename_prefix: str, generation: int) -> str:
+    return f"{os.path.basename(filename_prefix)}{generation}"
+
+def checkpoint_payload(generation: int, config: neat.Config, population: dict, species_set: Any) -> bytes:
+    return pickle.dumps((generation, config, population, species_set, random.getstate()), protocol=pickle.HIGHEST_PROTOCOL)
+
+def checkpoint_timestamp(name: str) -> str:
+    return name.split("-NEAT")[0]
+
+def is_checkpoint_name(name: str) -> bool:
+    return re.match(CHECKPOINT_NAME_PATTERN, name) is not None
+
+def checkpoint_generation(name: str) -> int | None:
+    '''
+    None for names that are not <timestamp>-NEAT-<generation>.
+    '''
+    match: re.Match | None = re.match(CHECKPOINT_NAME_PATTERN, name)
+    return int(match.group(1)) if match is not None else None
+
+class RetentionPolicy:
+    '''
+    Which checkpoints of a training run survive when a new one is saved.
+    Without keep_last and keep_every every checkpoint is kept.
+    keep_last: the newest N generations, keep_every: every Kth generation, keep_best: the one with the best fitness so far.
+    '''
+    def __init__(self, keep_last: int | None = None, keep_every: int | None = None, keep_best: bool = True) -> None:
+        self.keep_last: int | None = keep_last
+        self.keep_every: int | None = keep_every
+        self.keep_best: bool = keep_best
+
+    @property
+    def keeps_everything(self) -> bool:
+        return self.keep_last is None and self.keep_every is None
+
+    def select(self, entries: List[dict]) -> List[dict]:
+        '''
+        Entries of one run to delete.
+        '''
+        if self.keeps_everything or not entries:
+            return []
+
+        by_generation: List[dict] = sorted(entries, key=lambda entry: entry["generation"])
+        kept: set[str] = set()
+        if self.keep_last is not None and self.keep_last > 0:
+            kept.update(entry["name"] for entry in by_generation[-self.keep_last:])
+        if self.keep_every is not None and self.keep_every > 0:
+            kept.update(entry["name"] for entry in by_generation if entry["generation"] % self.keep_every == 0)
+        if self.keep_best:
+            scored = [entry for entry in by_generation if entry.get("best_fitness") is not None]
+            if scored:
+                kept.add(max(scored, key=lambda entry: entry["best_fitness"])["name"])
+        kept.add(by_generation[-1]["name"])
+
+        return [entry for entry in by_generation if entry["name"] not in kept]
+
+class CheckpointStore:
+    '''
+    Compressed NEAT checkpoints in a dedicated folder, listed by an index file instead of scanning the folder.
+
+    The checkpoint payload is the one of neat.Checkpointer, so checkpoints stay restorable by it.
+    Checkpoints written to the working directory by older versions are moved in when the index is first built.
+    The run manifest of a run, if it has one, is updated whenever its checkpoints change.
+    '''
+    def __init__(self, folder: str = CHECKPOINT_FOLDER, compression: str = DEFAULT_COMPRESSION, retention: RetentionPolicy | None = None) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown checkpoint compression {compression}, expected one of {', '.join(COMPRESSIONS)}")
+        self.folder: str = folder
+        self.compression: str = compression
+        self.retention: RetentionPolicy = retention if retention is not None else RetentionPolicy()
+        self._index: Dict[str, dict] | None = None
+        self._index_mtime: int = -1
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.folder, INDEX_FILENAME)
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.folder, filename)
+
+    def _stat_index(self) -> int:
+        try:
+            return os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            return -1
+
+    @property
+    def index(self) -> Dict[str, dict]:
+        '''
+        Name to entry of every stored checkpoint, read again when another store changed the index file.
+        '''
+        if self._index is None or self._stat_index() != self._index_mtime:
+            self._index = self._read_index()
+        return self._index
+
+    def _read_index(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, "r") as file:
+                data: dict = json.load(file)
+            if data.get("version") == INDEX_VERSION:
+                self._index_mtime = self._stat_index()
+                return {entry["name"]: entry for entry in data["checkpoints"] if is_checkpoint_name(entry["name"])}
+        except (OSError, ValueError, KeyError):
+            pass
+        return self.rebuild_index()
+
+    def _write_index(self) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        temporary_path: str = self.index_path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump({"version": INDEX_VERSION, "checkpoints": sorted((self._index or {}).values(), key=lambda entry: entry["name"])}, file, indent=1)
+        os.replace(temporary_path, self.index_path)
+        self._index_mtime = self._stat_index()
+
+    def manifest_path(self, timestamp: str) -> str:
+        return self.path(f"{timestamp}-NEAT-{MANIFEST_FILENAME_END}")
+
+    def load_manifest(self, timestamp: str) -> RunManifest | None:
+        try:
+            return RunManifest.read(self.manifest_path(timestamp))
+        except FileNotFoundError:
+            return None
+
+    def save_manifest(self, manifest: RunManifest) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        manifest.checkpoints = self.list(manifest.timestamp)
+        manifest.write(self.manifest_path(manifest.timestamp))
+
+    def update_manifest(self, timestamp: str, generation: int | None = None, best_fitness: Optional[float] = None) -> None:
+        '''
+        Records the best fitness of a saved generation and the checkpoints left after retention, for runs with a manifest.
+        '''
+        manifest: RunManifest | None = self.load_manifest(timestamp)
+        if manifest is None:
+            return
+        if generation is not None:
+            manifest.record_generation(generation, best_fitness)
+        self.save_manifest(manifest)
+
+    def rebuild_index(self) -> Dict[str, dict]:
+        '''
+        The only place that scans folders: moves legacy checkpoints from the working directory
+        into the store and indexes every checkpoint file of the store.
+        '''
+        os.makedirs(self.folder, exist_ok=True)
+        for filename in os.listdir():
+            if is_checkpoint_name(filename):
+                os.replace(filename, self.path(filename))
+
+        index: Dict[str, dict] = {}
+        for filename in os.listdir(self.folder):
+            name: str = filename
+            for extension, _ in COMPRESSIONS.values():
+                name = name.removesuffix(extension)
+            if is_checkpoint_name(name):
+                index[name] = {
+                    "name": name,
+                    "file": filename,
+                    "timestamp": checkpoint_timestamp(name),
+                    "generation": checkpoint_generation(name),
+                    "best_fitness": None,
+                    "created": datetime.fromtimestamp(os.path.getmtime(self.path(filename))).isoformat(timespec="seconds"),
+                }
+
+        self._index = index
+        self._write_index()
+        return index
+
+    def list(self, timestamp: str = "") -> List[str]:
+        return sorted(
+            (name for name, entry in self.index.items() if not timestamp or entry["timestamp"] == timestamp),
+            key=lambda name: (checkpoint_timestamp(name), checkpoint_generation(name)))
+
+    def save(self, filename_prefix: str, generation: int, config: neat.Config, population: dict, species_set: Any, best_fitness: Optional[float] = None) -> str:
+        name: str = checkpoint_name(filename_prefix, generation)
+        self.write(name, checkpoint_payload(generation, config, population, species_set), best_fitness)
+        return name
+
+    def write(self, name: str, payload: bytes, best_fitness: Optional[float] = None) -> None:
+        '''
+        Compresses and stores an already pickled checkpoint, then applies the retention policy to its run.
+        '''
+        if not is_checkpoint_name(name):
+            raise ValueError(f"{name} is not a checkpoint name, expected <timestamp>-NEAT-<generation>")
+        extension, open_compressed = COMPRESSIONS[self.compression]
+        filename: str = name + extension
+        os.makedirs(self.folder, exist_ok=True)
+
+        temporary_path: str = self.path(filename + ".tmp")
+        with open_compressed(temporary_path, "wb") as file:
+            file.write(payload)
+        os.replace(temporary_path, self.path(filename))
+
+        self.index[name] = {
+            "name": name,
+            "file": filename,
+            "timestamp": checkpoint_timestamp(name),
+            "generation": checkpoint_generation(name),
+            "best_fitness": best_fitness,
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.apply_retention(checkpoint_timestamp(name))
+        self._write_index()
+        self.update_manifest(checkpoint_timestamp(name), checkpoint_generation(name), best_fitness)
+
+    def apply_retention(self, timestamp: str) -> None:
+        entries: List[dict] = [entry for entry in self.index.values() if entry["timestamp"] == timestamp]
+        for entry in self.retention.select(entries):
+            self._remove_file(entry["file"])
+            del self.index[entry["name"]]
+
+    def _remove_file(self, filename: str) -> None:
+        try:
+            os.remove(self.path(filename))
+        except FileNotFoundError:
+            pass
+
+    def restore(self, name: str) -> neat.Population:
+        name = os.path.basename(name)
+        entry: dict | None = self.index.get(name)
+        if entry is None:
+            raise FileNotFoundError(f"No checkpoint named {name}")
+
+        filename: str = entry["file"]
+        open_compressed: Callable[..., Any] = gzip.open
+        for extension, opener in COMPRESSIONS.values():
+            if filename.endswith(extension):
+                open_compressed = opener
+
+        with open_compressed(self.path(filename), "rb") as file:
+            generation, config, population, species_set, random_state = pickle.load(file)
+        random.setstate(random_state)
+        return neat.Population(config, (population, species_set, generation))
+
+    def delete(self, name: str) -> None:
+        name = os.path.basename(name)
+        entry: dict | None = self.index.pop(name, None)
+        if entry is not None:
+            self._remove_file(entry["file"])
+            self._write_index()
+            self.update_manifest(entry["timestamp"])
+
+    def clear(self) -> None:
+        for entry in self.index.values():
+            self._remove_file(entry["file"])
+        self.index.clear()
+        self._write_index()
+
+class BackgroundCheckpointWriter:
+    '''
+    Compresses and writes pickled checkpoints into a CheckpointStore on a separate thread.
+
+    Pickling stays with the caller, because the next generation changes the genomes right away.
+    At most queue_size checkpoints wait to be written, saving blocks while the queue is full.
+    A failed write is raised by the next save, so a run does not go on without checkpoints.
+    '''
+    def __init__(self, store: CheckpointStore, queue_size: int = DEFAULT_WRITER_QUEUE_SIZE) -> None:
+        if queue_size < 1:
+            raise ValueError("Checkpoint writer queue size must be at least 1")
+        self.store: CheckpointStore = store
+        self.queue: queue.Queue[tuple[str, bytes, Optional[float]] | None] = queue.Queue(queue_size)
+        self.errors: List[Exception] = []
+        self.thread = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self.thread.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.store.write(*item)
+            except Exception as exception:
+                logger.error("Writing checkpoint %s failed: %s", item[0] if item else None, exception)
+                self.errors.append(exception)
+            finally:
+                self.queue.task_done()
+
+    def save(self, filename_prefix: str, generation: int, config: neat.Config, population: dict, species_set: Any, best_fitness: Optional[float] = None) -> str:
+        if not self.thread.is_alive():
+            raise RuntimeError("Checkpoint writer is closed")
+        self.raise_errors()
+        name: str = checkpoint_name(filename_prefix, generation)
+        self.queue.put((name, checkpoint_payload(generation, config, population, species_set), best_fitness))
+        return name
+
+    def flush(self) -> None:
+        '''
+        Waits until every queued checkpoint is on disk and raises the first error of the writes since the last flush.
+        '''
+        self.queue.join()
+        self.raise_errors()
+
+    def raise_errors(self) -> None:
+        if self.errors:
+            errors, self.errors = self.errors, []
+            raise errors[0]
+
+    def close(self) -> None:
+        '''
+        Writes the queued checkpoints and stops the thread.
+        Write errors are raised, unless close is called while another exception propagates (from a finally block),
+        which they would hide, then they were only logged.
+        '''
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if sys.exc_info()[1] is not None:
+            self.errors.clear()
+            return
+        self.flush()
+
+class CheckpointReporter(neat.reporting.BaseReporter):
+    '''
+    Drop-in replacement for neat.Checkpointer that saves into a CheckpointStore,
+    together with the best fitness of the generation for the retention policy.
+    With a writer the checkpoints are written in the background, the writer has to be closed after training.
+    '''
+    def __init__(self, store: CheckpointStore | BackgroundCheckpointWriter, filename_prefix: str, generation_interval: int = 1) -> None:
+        self.store: CheckpointStore | BackgroundCheckpointWriter = store
+        self.filename_prefix: str = filename_prefix
+        self.generation_interval: int = generation_interval
+        self.current_generation: int = 0
+        self.last_generation_checkpoint: int = -1
+        self.best_fitness: float | None = None
+
+    def __getstate__(self) -> dict:
+        # the species set pickled into every checkpoint references the reporters, but never saves through them
+        state: dict = self.__dict__.copy()
+        state["store"] = None
+        return state
+
+    def start_generation(self, generation: int) -> None:
+        self.current_generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome) -> None:
+        self.best_fitness = best_genome.fitness
+
+    def end_generation(self, config, population, species_set) -> None:
+        if self.current_generation - self.last_generation_checkpoint >= self.generation_interval:
+            self.store.save(self.filename_prefix, self.current_generation, config, population, species_set, self.best_fitness)
+            self.last_generation_checkpoint = self.current_generation
@@ -1,32 +1,61 @@
 import typer
+from typing import List, Optional
 from neat_training import main
 from simulation.player_test import test_drive
 from map_scripts.map_maker import create_new_map, edit_existing_map
 from map_scripts.map_tools import get_map_names, delete_map as delete_map_func, rename_map as rename_map_func
-from neat_save_load import clear_all_checkpoints
+from neat_save_load import clear_all_checkpoints, get_run_manifests
+from checkpoint_store import COMPRESSIONS, DEFAULT_COMPRESSION
 from main import open_main_menu
+from simulation.replay_viewer import play_replays
 from simulation.simulation_config import SimulationConfig
+from simulation.fitness_reduction import FITNESS_REDUCERS, check_map_weights
+from benchmarks.simulation_benchmark import run_benchmarks, write_results, format_results, DEFAULT_OUTPUT, POPULATION_SIZE, REPEATS
 
 app = typer.Typer()
 
 @app.command()
-def start() -> None:
-    main()
+def start(headless: bool = False) -> None:
+    main(headless=headless)
 
 @app.command()
 def main_menu() -> None:
     open_main_menu()
 
 @app.command()
-def start_with_params(car_count: int, hidden_layers_count: int, random_angle: bool, map_pool: list[str]) -> None:
+def start_with_params(car_count: int, hidden_layers_count: int, random_angle: bool, map_pool: list[str], headless: bool = False, workers: int = 1, steps_per_frame: int = 1, debug_ray_cars: int = 0, profile_log: Optional[str] = None, maps_per_generation: int = 1, fitness_reducer: str = "mean", map_weights: Optional[List[float]] = typer.Option(None, "--map-weight"), stall_ticks: Optional[int] = None, stop_hopeless_generations: bool = False, max_frames: Optional[int] = None, checkpoint_keep_last: Optional[int] = None, checkpoint_keep_every: Optional[int] = None, checkpoint_keep_best: bool = True, checkpoint_compression: str = DEFAULT_COMPRESSION, seed: Optional[int] = None, record_replays: bool = False) -> None:
+    if fitness_reducer not in FITNESS_REDUCERS:
+        raise typer.BadParameter(f"expected one of {', '.join(FITNESS_REDUCERS)}", param_hint="--fitness-reducer")
+    try:
+        check_map_weights(map_weights or None, map_pool)
+    except ValueError as error:
+        raise typer.BadParameter(str(error), param_hint="--map-weight")
+    if checkpoint_compression not in COMPRESSIONS:
+        raise typer.BadParameter(f"expected one of {', '.join(COMPRESSIONS)}", param_hint="--checkpoint-compression")
     config = SimulationConfig(
         num_iterations=100, 
         map_pool=map_pool, 
         hidden_layers=hidden_layers_count, 
         random_angle=random_angle,
         ray_count=8,
-        initial_population=car_count)
-    main(config)
+        initial_population=car_count,
+        workers=workers,
+        steps_per_frame=steps_per_frame,
+        debug_ray_cars=debug_ray_cars,
+        profile_log=profile_log,
+        maps_per_generation=maps_per_generation,
+        fitness_reducer=fitness_reducer,
+        map_weights=map_weights or None,
+        stall_ticks=stall_ticks,
+        stop_hopeless_generations=stop_hopeless_generations,
+        max_frames=max_frames,
+        checkpoint_keep_last=checkpoint_keep_last,
+        checkpoint_keep_every=checkpoint_keep_every,
+        checkpoint_keep_best=checkpoint_keep_best,
+        checkpoint_compression=checkpoint_compression,
+        seed=seed,
+        record_replays=record_replays)
+    main(config, headless)
     
 @app.command()
 def new_map() -> None:
@@ -58,5 +87,23 @@ def start_test_drive() -> None:
 def clear_checkpoints() -> None:
     clear_all_checkpoints()
 
+@app.command()
+def show_runs() -> None:
+    typer.echo("Saved training runs: ")
+    for manifest in get_run_manifests():
+        typer.echo(manifest.summary())
+    
+@app.command()
+def replay(paths: List[str], speed: float = 1) -> None:
+    play_replays(paths, speed)
+
+@app.command()
+def benchmark(output: str = DEFAULT_OUTPUT, population_size: int = POPULATION_SIZE, repeats: int = REPEATS, map_names: Optional[List[str]] = typer.Option(None, "--map")) -> None:
+    results = run_benchmarks(map_names, population_size, repeats)
+    write_results(results, output)
+    for line in format_results(results):
+        typer.echo(line)
+    typer.echo(f"Results written to {output}")
+
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -1,6 +1,6 @@
 import sys
 from PyQt5.QtWidgets import QApplication, QLabel, QPushButton, QMessageBox
-from neat_save_load import delete_checkpoint, get_saved_checkpoints, get_config, get_timestamp
+from neat_save_load import delete_checkpoint, get_saved_checkpoints, get_config, get_timestamp, get_run_manifest
 from neat_training import load_checkpoint
 
 from gui.scrollable_gallery import ScrollableGallery
@@ -14,8 +14,13 @@ class SavedTrainingGallery(ScrollableGallery):
     def populateGallery(self, saved_training_filenames) -> None:
         self.clear_rows()
         
+        summaries: dict[str, str] = {}
         for saved_training_filename in saved_training_filenames:
-            self.createSavedTrainingRow(saved_training_filename)
+            timestamp: str = get_timestamp(saved_training_filename)
+            if timestamp not in summaries:
+                manifest = get_run_manifest(timestamp)
+                summaries[timestamp] = manifest.summary() if manifest is not None else ""
+            self.createSavedTrainingRow(saved_training_filename, summaries[timestamp])
         self.stretch_items()
         
     def clear_rows(self):
@@ -23,8 +28,9 @@ class SavedTrainingGallery(ScrollableGallery):
             row[1].parentWidget().setParent(None)
         self.rows.clear()
         
-    def createSavedTrainingRow(self, saved_training_filename) -> None:
+    def createSavedTrainingRow(self, saved_training_filename, summary: str = "") -> None:
         saved_training_label = QLabel(saved_training_filename)
+        saved_training_label.setToolTip(summary)
         deleteButton = QPushButton('Delete')
         loadButton = QPushButton('Load')
         
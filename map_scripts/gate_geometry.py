@@ -0,0 +1,69 @@
+import numpy as np
+from typing import Sequence
+from map_scripts.map import Gate, GATE_TOLERANCE
+
+NO_GATE: int = -1
+
+class GateGeometry:
+    '''
+    Gate lines and widened bounding boxes as arrays, for checking the gate crossings of all cars at once.
+
+    A car passes its next gate when, between its previous and its current position, it changes
+    side of the gate line while ending inside the gate box widened by GATE_TOLERANCE.
+    That is the rule of Car.check_if_in_on_other_side_of_gate, computed for every car in one go.
+    '''
+    def __init__(self, gates: Sequence[Gate]) -> None:
+        self.gate_count: int = len(gates)
+        self.nums: np.ndarray = np.array([gate.num for gate in gates], dtype=np.int64)
+
+        self.starts: np.ndarray = np.array([tuple(gate.start_position) for gate in gates], dtype=np.float64).reshape(-1, 2)
+        self.deltas: np.ndarray = np.array([tuple(gate.end_position - gate.start_position) for gate in gates], dtype=np.float64).reshape(-1, 2)
+
+        self.wide_mins: np.ndarray = np.array([(gate.min_x - GATE_TOLERANCE, gate.min_y - GATE_TOLERANCE) for gate in gates], dtype=np.float64).reshape(-1, 2)
+        self.wide_maxs: np.ndarray = np.array([(gate.max_x + GATE_TOLERANCE, gate.max_y + GATE_TOLERANCE) for gate in gates], dtype=np.float64).reshape(-1, 2)
+
+    def next_gates(self, last_gates: np.ndarray, directions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Gates each car can pass next and the direction it drives in after passing them, as (cars, 2) arrays.
+        A car without a direction yet can take the first gate forwards or the last one backwards,
+        other cars only have the first column (the second is NO_GATE).
+        '''
+        undecided: np.ndarray = directions == 0
+        candidates = np.empty((len(directions), 2), dtype=np.int64)
+        candidates[:, 0] = np.where(undecided, 0, (last_gates + directions) % self.gate_count)
+        candidates[:, 1] = np.where(undecided, self.gate_count - 1, NO_GATE)
+
+        candidate_directions = np.empty((len(directions), 2), dtype=np.int64)
+        candidate_directions[:, 0] = np.where(undecided, 1, directions)
+        candidate_directions[:, 1] = -1
+        return candidates, candidate_directions
+
+    def sides(self, gate_indices: np.ndarray, points: np.ndarray) -> np.ndarray:
+        '''
+        Same as Gate.calculate_side for each gate index and point (-1, 0 or 1).
+        '''
+        starts = self.starts[gate_indices]
+        deltas = self.deltas[gate_indices]
+        cross_products = deltas[..., 0] * (points[..., 1] - starts[..., 1]) - deltas[..., 1] * (points[..., 0] - starts[..., 0])
+        return -np.sign(cross_products).astype(np.int64)
+
+    def inside_wider(self, gate_indices: np.ndarray, points: np.ndarray) -> np.ndarray:
+        return np.all((points > self.wide_mins[gate_indices]) & (points < self.wide_maxs[gate_indices]), axis=-1)
+
+    def sides_of_next_gates(self, candidates: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        return self.sides(candidates, positions[:, None, :])
+
+    def crossed_gates(self, candidates: np.ndarray, candidate_directions: np.ndarray, previous_sides: np.ndarray, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        Returns a mask of the cars that passed one of their candidate gates, and the gate number and new direction of each car.
+        The first candidate wins when both were passed in the same tick.
+        '''
+        valid: np.ndarray = candidates != NO_GATE
+        nums = self.nums[np.where(valid, candidates, 0)]
+        points = positions[:, None, :]
+
+        passed = valid & self.inside_wider(nums, points) & (self.sides(nums, points) != previous_sides)
+        first_passed = np.argmax(passed, axis=1)
+        rows = np.arange(len(candidates))
+
+        return passed.any(axis=1), nums[rows, first_passed], candidate_directions[rows, first_passed]
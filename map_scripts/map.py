@@ -1,5 +1,8 @@
+import numpy as np
 import pygame as pg
 from pygame.math import Vector2
+from typing import List, Sequence
+from math import atan2, degrees, pi
 from vector_math import point_left_or_right_of_line # type: ignore
 
 WALL_COLOR = pg.Color(193, 216, 252)
@@ -16,12 +19,48 @@ class Wall:
     def draw(self, win) -> None:
         pg.draw.line(win, WALL_COLOR, self.start_position, self.end_position, self.thickness)
 
+def wall_arrays(walls: Sequence[Wall]) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Contiguous (walls, 2) arrays of wall start and end positions.
+    '''
+    wall_starts = np.array([(wall.start_position.x, wall.start_position.y) for wall in walls], dtype=np.float64).reshape(-1, 2)
+    wall_ends = np.array([(wall.end_position.x, wall.end_position.y) for wall in walls], dtype=np.float64).reshape(-1, 2)
+    return wall_starts, wall_ends
+
 class Gate:
     def __init__(self, num: int, x1, y1, x2, y2, thickness=DEFAULT_THICKNESS) -> None:
-        self.start_position = Vector2(x1, y1)
-        self.end_position = Vector2(x2, y2)
+        self._start_position = Vector2(x1, y1)
+        self._end_position = Vector2(x2, y2)
         self.thickness: int = thickness
         self.num: int = num
+        self._update_bounds()
+
+    @property
+    def start_position(self) -> Vector2:
+        return self._start_position
+
+    @start_position.setter
+    def start_position(self, position: Vector2) -> None:
+        self._start_position = position
+        self._update_bounds()
+
+    @property
+    def end_position(self) -> Vector2:
+        return self._end_position
+
+    @end_position.setter
+    def end_position(self, position: Vector2) -> None:
+        self._end_position = position
+        self._update_bounds()
+
+    def _update_bounds(self) -> None:
+        '''
+        Bounding box of the gate, recomputed only when an end is moved (the map maker drags them).
+        '''
+        self.min_x: float = min(self._start_position.x, self._end_position.x)
+        self.max_x: float = max(self._start_position.x, self._end_position.x)
+        self.min_y: float = min(self._start_position.y, self._end_position.y)
+        self.max_y: float = max(self._start_position.y, self._end_position.y)
 
     def get_centre_position(self) -> Vector2:
         return self.start_position + (self.end_position - self.start_position) / 2
@@ -30,53 +69,22 @@ class Gate:
         return point_left_or_right_of_line(self.start_position, self.end_position, point)        
 
     def check_if_inside(self, position) -> bool:
-        x1: float
-        x2: float
-        y1: float
-        y2: float
-        if self.start_position.x < self.end_position.x:
-            x1 = self.start_position.x
-            x2 = self.end_position.x
-        else:
-            x1 = self.end_position.x
-            x2 = self.start_position.x
-        
-        if self.start_position.y < self.end_position.y:
-            y1 = self.start_position.y
-            y2 = self.end_position.y
-        else:
-            y1 = self.end_position.y
-            y2 = self.start_position.y
-
-        return position.x > x1 and \
-               position.y > y1 and \
-               position.x < x2 and \
-               position.y < y2
+        return self.min_x < position.x < self.max_x and self.min_y < position.y < self.max_y
                
     def check_if_inside_wider(self, position) -> bool:
-        x1: float
-        x2: float
-        y1: float
-        y2: float
-        if self.start_position.x < self.end_position.x:
-            x1 = self.start_position.x
-            x2 = self.end_position.x
-        else:
-            x1 = self.end_position.x
-            x2 = self.start_position.x
-        
-        if self.start_position.y < self.end_position.y:
-            y1 = self.start_position.y
-            y2 = self.end_position.y
-        else:
-            y1 = self.end_position.y
-            y2 = self.start_position.y
-
-        return position.x > x1 - GATE_TOLERANCE and \
-               position.y > y1 - GATE_TOLERANCE and \
-               position.x < x2 + GATE_TOLERANCE and \
-               position.y < y2 + GATE_TOLERANCE
+        return self.min_x - GATE_TOLERANCE < position.x < self.max_x + GATE_TOLERANCE and \
+               self.min_y - GATE_TOLERANCE < position.y < self.max_y + GATE_TOLERANCE
 
     def draw(self, win) -> None:
         pg.draw.line(win, GATE_COLOR, self.start_position, self.end_position, self.thickness)
         
+
+
+def angle_between(p1: Vector2, p2: Vector2) -> float:
+    return degrees(atan2(-(p2.y - p1.y), p2.x - p1.x) % (2 * pi)) + 180
+
+def find_angle_to_first_gate(position: Vector2, gates: List[Gate]) -> float:
+    if gates:
+        return angle_between(position, gates[0].get_centre_position())
+    else:
+        raise ValueError("No gates found in the map")
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import numpy as np
+from pygame.math import Vector2
+from typing import List
+from map_scripts.map import Wall, Gate
+from map_scripts.map_tools import MAP_FOLDER
+
+MAP_CACHE_FOLDER: str = os.path.join(MAP_FOLDER, ".cache")
+MAP_CACHE_EXTENSION: str = ".bin"
+
+MAP_CACHE_MAGIC: int = 0x53434D4150 # "SCMAP"
+MAP_CACHE_VERSION: int = 1
+
+# the cache file is a raw little endian int64 array: this header, then the walls (x1, y1, x2, y2) and gates (num, x1, y1, x2, y2)
+MAGIC, VERSION, SOURCE_MTIME, SOURCE_SIZE, SOURCE_HASH, WALL_COUNT, GATE_COUNT, START_X, START_Y = range(9)
+HEADER_SIZE: int = 9
+CACHE_DTYPE = np.dtype("<i8")
+
+class CachedMap:
+    '''
+    Packed, read-only arrays of a map, memory mapped from its cache file.
+    '''
+    def __init__(self, data: np.ndarray) -> None:
+        wall_count: int = int(data[WALL_COUNT])
+        gate_count: int = int(data[GATE_COUNT])
+        walls_end: int = HEADER_SIZE + 4 * wall_count
+
+        self.walls: np.ndarray = data[HEADER_SIZE:walls_end].reshape(wall_count, 4)
+        self.gates: np.ndarray = data[walls_end:walls_end + 5 * gate_count].reshape(gate_count, 5)
+        self.starting_point: tuple[int, int] = int(data[START_X]), int(data[START_Y])
+
+    def to_objects(self) -> tuple[List[Wall], List[Gate], Vector2]:
+        walls: List[Wall] = [Wall(*wall) for wall in self.walls.tolist()]
+        gates: List[Gate] = [Gate(*gate) for gate in self.gates.tolist()]
+        return walls, gates, Vector2(self.starting_point)
+
+def cache_path(filename: str) -> str:
+    return os.path.join(MAP_CACHE_FOLDER, os.path.splitext(filename)[0] + MAP_CACHE_EXTENSION)
+
+def source_hash(source_path: str) -> int:
+    with open(source_path, "rb") as f:
+        return int.from_bytes(hashlib.blake2b(f.read(), digest_size=8).digest(), "little", signed=True)
+
+def pack_map(walls: List[Wall], gates: List[Gate], starting_point: Vector2, source_path: str) -> np.ndarray:
+    stat: os.stat_result = os.stat(source_path)
+    header: List[int] = [0] * HEADER_SIZE
+    header[MAGIC] = MAP_CACHE_MAGIC
+    header[VERSION] = MAP_CACHE_VERSION
+    header[SOURCE_MTIME] = stat.st_mtime_ns
+    header[SOURCE_SIZE] = stat.st_size
+    header[SOURCE_HASH] = source_hash(source_path)
+    header[WALL_COUNT] = len(walls)
+    header[GATE_COUNT] = len(gates)
+    header[START_X] = int(starting_point.x)
+    header[START_Y] = int(starting_point.y)
+
+    wall_values = [int(value) for wall in walls for value in (*wall.start_position, *wall.end_position)]
+    gate_values = [int(value) for gate in gates for value in (gate.num, *gate.start_position, *gate.end_position)]
+    return np.array(header + wall_values + gate_values, dtype=CACHE_DTYPE)
+
+def write_cache(path: str, data: np.ndarray) -> None:
+    '''
+    Writes to a temporary file first, so that other processes never memory map a half written cache.
+    '''
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path: str = f"{path}.{os.getpid()}.tmp"
+    data.astype(CACHE_DTYPE).tofile(temporary_path)
+    os.replace(temporary_path, path)
+
+def load_cached_map(filename: str) -> CachedMap | None:
+    '''
+    Memory maps the cache of the map if it was built from the current text file.
+    A changed modification time alone (e.g. a saved but unchanged map) only refreshes the cache header.
+    '''
+    path: str = cache_path(filename)
+    source_path: str = os.path.join(MAP_FOLDER, filename)
+    try:
+        data: np.ndarray = np.memmap(path, dtype=CACHE_DTYPE, mode="r")
+        stat: os.stat_result = os.stat(source_path)
+    except (OSError, ValueError):
+        return None
+
+    if len(data) < HEADER_SIZE or data[MAGIC] != MAP_CACHE_MAGIC or data[VERSION] != MAP_CACHE_VERSION:
+        return None
+    if len(data) != HEADER_SIZE + 4 * data[WALL_COUNT] + 5 * data[GATE_COUNT]:
+        return None
+
+    if data[SOURCE_MTIME] != stat.st_mtime_ns or data[SOURCE_SIZE] != stat.st_size:
+        if data[SOURCE_SIZE] != stat.st_size or data[SOURCE_HASH] != source_hash(source_path):
+            return None
+        refreshed: np.ndarray = np.array(data)
+        refreshed[SOURCE_MTIME] = stat.st_mtime_ns
+        try:
+            write_cache(path, refreshed)
+        except OSError:
+            pass
+        return CachedMap(refreshed)
+
+    return CachedMap(data)
+
+def store_cached_map(filename: str, walls: List[Wall], gates: List[Gate], starting_point: Vector2) -> None:
+    '''
+    Best effort, a read-only maps folder just means the text file is parsed every time.
+    '''
+    try:
+        write_cache(cache_path(filename), pack_map(walls, gates, starting_point, os.path.join(MAP_FOLDER, filename)))
+    except OSError:
+        pass
@@ -0,0 +1,53 @@
+import pygame as pg
+from pygame.font import Font
+from pygame.surface import Surface
+from typing import Sequence
+from map_scripts.map import Wall, Gate
+from pygame_extensions.text_cache import TEXT_CACHE
+
+# not used by any map object, so it can mark the transparent pixels of the wall layer
+WALL_LAYER_COLORKEY = pg.Color(255, 0, 255)
+GATE_LABEL_COLOR = (255, 255, 255)
+
+def display_surface(size: tuple[int, int]) -> Surface:
+    surface = Surface(size)
+    return surface.convert() if pg.display.get_surface() is not None else surface
+
+class MapLayer:
+    '''
+    The parts of a map that do not change while it is shown, drawn once into off-screen surfaces.
+
+    The background layer holds the background, the gates and, with a label font, the gate numbers.
+    With separate_walls the walls get their own colour keyed layer, to be drawn after the cars so they stay on top,
+    otherwise they are drawn into the background layer below the gates.
+    '''
+    def __init__(self, size: tuple[int, int], walls: Sequence[Wall], gates: Sequence[Gate], background: Surface | None = None,
+                 background_color=pg.Color(32, 32, 32), label_font: Font | None = None, separate_walls: bool = True) -> None:
+        self.background: Surface = display_surface(size)
+        if background is not None:
+            self.background.blit(background, (0, 0))
+        else:
+            self.background.fill(background_color)
+
+        self.walls: Surface | None = None
+        if separate_walls:
+            self.walls = display_surface(size)
+            self.walls.fill(WALL_LAYER_COLORKEY)
+            for wall in walls:
+                wall.draw(self.walls)
+            self.walls.set_colorkey(WALL_LAYER_COLORKEY, pg.RLEACCEL)
+        else:
+            for wall in walls:
+                wall.draw(self.background)
+
+        for gate in gates:
+            gate.draw(self.background)
+            if label_font is not None:
+                self.background.blit(TEXT_CACHE.render(label_font, str(gate.num), True, GATE_LABEL_COLOR), gate.get_centre_position())
+
+    def draw_background(self, win: Surface) -> None:
+        win.blit(self.background, (0, 0))
+
+    def draw_walls(self, win: Surface) -> None:
+        if self.walls is not None:
+            win.blit(self.walls, (0, 0))
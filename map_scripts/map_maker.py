@@ -4,9 +4,11 @@ from pygame import Vector2
 from pygame.key import ScancodeWrapper
 from pygame.surface import Surface
 from map_scripts.map import Wall, Gate
+from map_scripts.map_layer import MapLayer
 from map_scripts.map_reader import read_map_txt
 from map_scripts.map_tools import format_map_name
 from pygame_extensions.pyui_elements import PyInputBox, PyButton
+from pygame_extensions.text_cache import TEXT_CACHE
 from simulation.simulation_ui import PyMapMakerUi
 import ctypes
 
@@ -42,6 +44,8 @@ class MapMaker:
         self.quit_pygame = False
         
         self.font = pg.font.SysFont("arial", 32)
+        self.map_layer: MapLayer | None = None
+        self.map_layer_key: tuple | None = None
         self.ui: PyMapMakerUi = PyMapMakerUi(self.win, self.ask_to_close, self.try_to_save, WIDTH, HEIGHT)
         self.ui.set_map_name(default_filename)
         
@@ -51,19 +55,37 @@ class MapMaker:
         self.gates = gates
         self.starting_point = starting_point
 
+    def static_objects(self) -> tuple[list[Wall], list[Gate]]:
+        '''
+        Walls and gates that are not being placed right now.
+        '''
+        walls: list[Wall] = self.walls[:-1] if self.placing_wall else self.walls
+        gates: list[Gate] = self.gates[:-1] if self.placing_gate else self.gates
+        return walls, gates
+
+    def static_layer(self, bg_img: Surface) -> MapLayer:
+        '''
+        Background with the static walls and gates, drawn again only when one is added or removed.
+        '''
+        walls, gates = self.static_objects()
+        key: tuple = (id(self.walls), id(self.gates), len(walls), len(gates))
+        if self.map_layer is None or self.map_layer_key != key:
+            self.map_layer = MapLayer((WIDTH, HEIGHT), walls, gates, bg_img if USE_BG_IMG else None, BG_COLOR, self.font, separate_walls=False)
+            self.map_layer_key = key
+        return self.map_layer
+
     def draw_background(self, bg_img: Surface) -> None:
-        if USE_BG_IMG:
-            self.win.blit(bg_img, (0, 0))
-        else:
-            self.win.fill(BG_COLOR)
+        self.static_layer(bg_img).draw_background(self.win)
 
     def draw_window(self, win) -> None:            
-        for wall in self.walls:
+        static_walls, static_gates = self.static_objects()
+
+        for wall in self.walls[len(static_walls):]:
             wall.draw(win)
 
-        for gate in self.gates:
+        for gate in self.gates[len(static_gates):]:
             gate.draw(win)      
-            text = self.font.render(str(gate.num), True, (255, 255, 255))
+            text = TEXT_CACHE.render(self.font, str(gate.num), True, (255, 255, 255))
             self.win.blit(text, gate.get_centre_position())
         
         pg.draw.circle(win, (0, 255, 0), self.starting_point, 10)     
@@ -2,6 +2,7 @@ import enum
 from pygame import Vector2
 from map_scripts.map import Wall, Gate
 from map_scripts.map_tools import DEFAULT_MAP
+from map_scripts.map_cache import CachedMap, load_cached_map, store_cached_map
 from typing import List
 import re
 
@@ -45,6 +46,19 @@ def read_map_txt(filename: str) -> tuple[list, list, Vector2]:
                     gates.append(Gate(num, x1, x2, y1, y2))
     
     return walls, gates, starting_point
+
+def read_map(filename: str) -> tuple[list, list, Vector2]:
+    '''
+    Same result as read_map_txt, but from the binary cache of the map when it is up to date.
+    The text file is parsed and cached on the first load and whenever it changes.
+    '''
+    cached_map: CachedMap | None = load_cached_map(filename)
+    if cached_map is not None:
+        return cached_map.to_objects()
+
+    walls, gates, starting_point = read_map_txt(filename)
+    store_cached_map(filename, walls, gates, starting_point)
+    return walls, gates, starting_point
             
 if __name__ == "__main__":
     walls, gates, starting_point = read_map_txt(DEFAULT_MAP)
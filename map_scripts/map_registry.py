@@ -0,0 +1,85 @@
+import os
+from collections import OrderedDict
+from pygame.math import Vector2
+from typing import Iterable, List
+from cars.ray_sensors import RaySensorEngine
+from map_scripts.map import Wall, Gate, find_angle_to_first_gate
+from map_scripts.map_reader import read_map
+from map_scripts.map_tools import MAP_FOLDER
+
+DEFAULT_MAP_REGISTRY_CAPACITY: int = 16
+
+class LoadedMap:
+    '''
+    A map loaded once and shared by every generation that runs on it.
+    Walls and gates must be treated as read-only, as well as the derived data below.
+    '''
+    def __init__(self, name: str, walls: List[Wall], gates: List[Gate], starting_point: Vector2, source_mtime: int) -> None:
+        self.name: str = name
+        self.walls: List[Wall] = walls
+        self.gates: List[Gate] = gates
+        self.starting_point: Vector2 = starting_point
+        self.source_mtime: int = source_mtime
+
+        self.gate_centres: List[Vector2] = [gate.get_centre_position() for gate in gates]
+        self.angle_to_first_gate: float | None = find_angle_to_first_gate(starting_point, gates) if gates else None
+
+        # wall arrays and the wall grid of the map, shared by all simulations on it
+        self.ray_sensors: RaySensorEngine = RaySensorEngine(walls)
+
+    def intended_angle(self) -> float:
+        if self.angle_to_first_gate is None:
+            return find_angle_to_first_gate(self.starting_point, self.gates)
+        return self.angle_to_first_gate
+
+def source_mtime(map_name: str) -> int:
+    try:
+        return os.stat(os.path.join(MAP_FOLDER, map_name)).st_mtime_ns
+    except OSError:
+        return -1
+
+class MapRegistry:
+    '''
+    Least recently used cache of LoadedMap by map name. A map whose file changed is loaded again.
+
+    Maps loaded before a process pool is created are inherited by the forked workers,
+    each of which then keeps its own registry for the rest of the run.
+    '''
+    def __init__(self, capacity: int = DEFAULT_MAP_REGISTRY_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("Map registry capacity must be at least 1")
+        self.capacity: int = capacity
+        self._maps: OrderedDict[str, LoadedMap] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._maps)
+
+    def __contains__(self, map_name: str) -> bool:
+        return map_name in self._maps
+
+    def get(self, map_name: str) -> LoadedMap:
+        mtime: int = source_mtime(map_name)
+        loaded_map: LoadedMap | None = self._maps.get(map_name)
+
+        if loaded_map is None or loaded_map.source_mtime != mtime:
+            walls, gates, starting_point = read_map(map_name)
+            loaded_map = LoadedMap(map_name, walls, gates, starting_point, mtime)
+            self._maps[map_name] = loaded_map
+
+        self._maps.move_to_end(map_name)
+        while len(self._maps) > self.capacity:
+            self._maps.popitem(last=False)
+
+        return loaded_map
+
+    def preload(self, map_names: Iterable[str]) -> None:
+        for map_name in map_names:
+            self.get(map_name)
+
+    def clear(self) -> None:
+        self._maps.clear()
+
+MAP_REGISTRY = MapRegistry()
+
+def get_map(map_name: str) -> LoadedMap:
+    return MAP_REGISTRY.get(map_name)
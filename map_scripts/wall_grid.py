@@ -0,0 +1,122 @@
+import math
+import numpy as np
+from typing import Dict, List, Sequence
+
+DEFAULT_CELL_SIZE: float = 50
+CORNER_EPSILON: float = 1e-9
+
+class WallGrid:
+    '''
+    Uniform grid over wall segments, built once per map.
+
+    Every wall is registered in each cell its segment passes through, so the rays
+    of a car only need to be tested against the walls of the cells they can reach.
+    '''
+    def __init__(self, wall_starts: np.ndarray, wall_ends: np.ndarray, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        self.cell_size: float = cell_size
+        self.wall_count: int = len(wall_starts)
+
+        points = np.vstack((wall_starts, wall_ends)) if self.wall_count > 0 else np.zeros((1, 2))
+        self.origin: np.ndarray = points.min(axis=0) - cell_size
+        extent: np.ndarray = points.max(axis=0) + cell_size - self.origin
+        self.columns: int = int(math.ceil(extent[0] / cell_size)) + 1
+        self.rows: int = int(math.ceil(extent[1] / cell_size)) + 1
+
+        self.cell_walls: List[List[int]] = [[] for _ in range(self.columns * self.rows)]
+        for wall_index, (start, end) in enumerate(zip(wall_starts.tolist(), wall_ends.tolist())):
+            for cell in self.cells_along_segment(start, end):
+                self.cell_walls[cell].append(wall_index)
+
+        self._neighbourhoods: Dict[int, np.ndarray] = {}
+
+    @property
+    def cell_count(self) -> int:
+        return self.columns * self.rows
+
+    def _cell_coordinates(self, point: Sequence[float]) -> tuple[float, float]:
+        return (point[0] - self.origin[0]) / self.cell_size, (point[1] - self.origin[1]) / self.cell_size
+
+    def _flat_cell(self, column: int, row: int) -> int | None:
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return row * self.columns + column
+        return None
+
+    def cells_along_segment(self, start: Sequence[float], end: Sequence[float]) -> List[int]:
+        '''
+        Flat indices of the cells a segment passes through (Amanatides-Woo traversal).
+        When the segment crosses a cell corner, both cells next to the corner are included.
+        '''
+        x0, y0 = self._cell_coordinates(start)
+        x1, y1 = self._cell_coordinates(end)
+        dx, dy = x1 - x0, y1 - y0
+
+        column, row = math.floor(x0), math.floor(y0)
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        t_delta_x = abs(1 / dx) if dx != 0 else math.inf
+        t_delta_y = abs(1 / dy) if dy != 0 else math.inf
+        t_max_x = ((column + 1 - x0) if dx > 0 else (x0 - column)) * t_delta_x if dx != 0 else math.inf
+        t_max_y = ((row + 1 - y0) if dy > 0 else (y0 - row)) * t_delta_y if dy != 0 else math.inf
+
+        cells: List[int] = []
+
+        def visit(column: int, row: int) -> None:
+            cell = self._flat_cell(column, row)
+            if cell is not None and (not cells or cells[-1] != cell):
+                cells.append(cell)
+
+        visit(column, row)
+        while min(t_max_x, t_max_y) <= 1:
+            if abs(t_max_x - t_max_y) < CORNER_EPSILON:
+                visit(column + step_x, row)
+                visit(column, row + step_y)
+                column += step_x
+                row += step_y
+                t_max_x += t_delta_x
+                t_max_y += t_delta_y
+            elif t_max_x < t_max_y:
+                column += step_x
+                t_max_x += t_delta_x
+            else:
+                row += step_y
+                t_max_y += t_delta_y
+            visit(column, row)
+
+        return cells
+
+    def _neighbourhood_matrix(self, radius: float) -> np.ndarray:
+        '''
+        For every cell, the walls of all cells that a ray of the given length starting in it can reach,
+        padded with -1 into a (cells, max walls) matrix.
+        '''
+        reach: int = int(math.ceil(radius / self.cell_size))
+        if reach in self._neighbourhoods:
+            return self._neighbourhoods[reach]
+
+        neighbourhoods: List[List[int]] = []
+        for row in range(self.rows):
+            for column in range(self.columns):
+                walls: set[int] = set()
+                for near_row in range(max(0, row - reach), min(self.rows, row + reach + 1)):
+                    for near_column in range(max(0, column - reach), min(self.columns, column + reach + 1)):
+                        walls.update(self.cell_walls[near_row * self.columns + near_column])
+                neighbourhoods.append(sorted(walls))
+
+        width: int = max([len(walls) for walls in neighbourhoods] + [1])
+        matrix = np.full((self.cell_count, width), -1, dtype=np.int64)
+        for cell, walls in enumerate(neighbourhoods):
+            matrix[cell, :len(walls)] = walls
+
+        self._neighbourhoods[reach] = matrix
+        return matrix
+
+    def candidate_walls(self, origins: np.ndarray, radius: float) -> np.ndarray:
+        '''
+        Indices of the walls that rays of the given length from each origin could hit, as a
+        (origins, max walls) matrix padded with -1. Origins outside the grid use the nearest border cell.
+        '''
+        matrix: np.ndarray = self._neighbourhood_matrix(radius)
+        cells = np.floor((origins - self.origin) / self.cell_size).astype(np.int64)
+        columns = np.clip(cells[:, 0], 0, self.columns - 1)
+        rows = np.clip(cells[:, 1], 0, self.rows - 1)
+        return matrix[rows * self.columns + columns]
@@ -1,45 +1,69 @@
 import pickle
 from simulation.simulation_config import SimulationConfig
+from checkpoint_store import CheckpointStore, CHECKPOINT_FOLDER, checkpoint_timestamp
+from run_manifest import RunManifest
 import os
-import re
 
 SIMULATION_CONFIG_FILENAME_END = "simulation-config.pkl"
 NEAT_INFIX = "-NEAT-"
 
+CHECKPOINT_STORE = CheckpointStore()
+
+def legacy_config_paths(timestamp: str) -> list[str]:
+    # pickled configs of older versions, next to the checkpoints in the working directory or in the checkpoint folder
+    filename: str = timestamp + NEAT_INFIX + SIMULATION_CONFIG_FILENAME_END
+    return [os.path.join(CHECKPOINT_FOLDER, filename), filename]
+
+def delete_config(timestamp: str) -> None:
+    for path in [CHECKPOINT_STORE.manifest_path(timestamp)] + legacy_config_paths(timestamp):
+        if os.path.exists(path):
+            os.remove(path)
+
 def save_config(simulation_config: SimulationConfig, filename_prefix) -> None:
-    with open(filename_prefix + SIMULATION_CONFIG_FILENAME_END, 'wb') as file:
-        pickle.dump(simulation_config, file)
-        
+    timestamp: str = get_timestamp(filename_prefix)
+    manifest: RunManifest | None = get_run_manifest(timestamp)
+    if manifest is None:
+        manifest = RunManifest(timestamp, simulation_config)
+    manifest.simulation_config = simulation_config
+    CHECKPOINT_STORE.save_manifest(manifest)
+
+def get_run_manifest(timestamp: str) -> RunManifest | None:
+    return CHECKPOINT_STORE.load_manifest(timestamp)
+
+def get_run_manifests() -> list[RunManifest]:
+    timestamps: list[str] = sorted({get_timestamp(checkpoint) for checkpoint in get_saved_checkpoints()})
+    manifests: list[RunManifest | None] = [get_run_manifest(timestamp) for timestamp in timestamps]
+    return [manifest for manifest in manifests if manifest is not None]
+
 def get_config(timestamp: str) -> SimulationConfig:
-    with open(timestamp + NEAT_INFIX + SIMULATION_CONFIG_FILENAME_END, 'rb') as file:
-        return pickle.load(file)
-                    
+    manifest: RunManifest | None = get_run_manifest(timestamp)
+    if manifest is not None:
+        return manifest.simulation_config
+
+    for path in legacy_config_paths(timestamp):
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                return pickle.load(file)
+    raise FileNotFoundError(f"No simulation config saved for the training run {timestamp}")
+
 def get_saved_checkpoints(timestamp: str="") -> list[str]:
-    saved_trainings: list[str] = []
-    
-    for file in os.listdir():
-        if re.match(r'\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}-NEAT-\d+$', file):
-            saved_trainings.append(file)
-    
-    return saved_trainings
-            
-def delete_checkpoint(checkpoint: str):   
+    return CHECKPOINT_STORE.list(timestamp)
+
+def delete_checkpoint(checkpoint: str):
     timestamp: str = get_timestamp(checkpoint)
-    
-    os.remove(checkpoint)
-    
+
+    CHECKPOINT_STORE.delete(checkpoint)
+
     if len(get_saved_checkpoints(timestamp)) > 0:
         return
-    
+
     # delete config file, if no checkpoint uses it anymore
-    for file in os.listdir():
-        if file.startswith(timestamp):
-            os.remove(file)
-    
+    delete_config(timestamp)
+
 def clear_all_checkpoints():
-    for file in os.listdir():
-        if re.match(r'\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}-NEAT-*$', file):
-            os.remove(file)
-    
+    for timestamp in {get_timestamp(checkpoint) for checkpoint in get_saved_checkpoints()}:
+        delete_config(timestamp)
+    CHECKPOINT_STORE.clear()
+
 def get_timestamp(checkpoint: str) -> str:
-    return checkpoint.split("-NEAT")[0]
\ No newline at end of file
+    return checkpoint_timestamp(os.path.basename(checkpoint))
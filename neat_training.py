@@ -1,16 +1,26 @@
 import neat # type: ignore
+import numpy as np
 import os
 import pygame as pg
 from pygame.math import Vector2
 from typing import List, Optional
 from simulation.simulation import Simulation, BreakTrainingException
+from simulation.headless_simulation import HeadlessSimulation
+from simulation.parallel_evaluation import ParallelGenerationEvaluator, evaluate_genomes
+from simulation.fitness_reduction import reduce_fitness, check_map_weights
+from simulation.early_stopping import EarlyStopPolicy
+from simulation.replay import ReplayRecorder, replay_path
+from simulation.seeding import derive_seed, random_stream, MAP_STREAM, START_ANGLE_STREAM, NEAT_STREAM
 from simulation.simulation_setup import setup_generation
 from simulation.simulation_config import SimulationConfig
 from map_scripts.map_tools import DEFAULT_MAP
+from map_scripts.map_registry import MAP_REGISTRY, get_map
+from cars.ray_sensors import RaySensorEngine
 import random
 from simulation.statistics import SimulationStatistics
 from datetime import datetime   
-from neat_save_load import save_config, get_timestamp, NEAT_INFIX, get_config
+from neat_save_load import save_config, get_timestamp, NEAT_INFIX, get_config, CHECKPOINT_STORE
+from checkpoint_store import CheckpointStore, CheckpointReporter, RetentionPolicy, BackgroundCheckpointWriter
 
 WIDTH = 1280
 HEIGHT = 960
@@ -28,16 +38,26 @@ RAY_LENGTH: float = 200
 NON_RAY_INPUTS: int = 2
 
 class NeatTrainingAttempt:
-    def __init__(self, config_path, simulation_config: Optional[SimulationConfig] = None) -> None:
+    def __init__(self, config_path, simulation_config: Optional[SimulationConfig] = None, headless: bool = False) -> None:
         self.gen: int = 0
+        self.headless: bool = headless
+        # fast forward toggled in the window carries over to the next generations
+        self.fast_forward: bool = False
 
         self.config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
                                     neat.DefaultStagnation, config_path)
         
         self.statistics: List[SimulationStatistics] = [NeatTrainingAttempt.default_simulation_statistics()]
+        
+        self.evaluator: ParallelGenerationEvaluator | None = None
+        # without a pool, simulates the extra maps of a generation while the first one runs in this process
+        self.background_evaluator: ParallelGenerationEvaluator | None = None
+        # names the replays of the run
+        self.filename_prefix: str = ""
 
         self.simulation_config: Optional[SimulationConfig] = None
         if simulation_config is not None:
+            check_map_weights(simulation_config.map_weights, simulation_config.map_pool)
             self.simulation_config = simulation_config
             NeatTrainingAttempt.inject_simulation_config(self.config, simulation_config)
             
@@ -51,30 +71,129 @@ class NeatTrainingAttempt:
     def get_ray_count_from_config(config) -> int:
         return config.genome_config.num_inputs - NON_RAY_INPUTS
     
+    def map_random(self):
+        '''
+        Source of the map choice of the current generation: its own stream in seeded runs, the global random module otherwise.
+        '''
+        seed: int | None = self.get_simulation_config().seed
+        if seed is None:
+            return random
+        return random_stream(seed, MAP_STREAM, self.gen)
+
     def pick_map(self) -> str:
         if self.simulation_config is None:
             return DEFAULT_MAP
-        return random.choice(self.simulation_config.map_pool)
-
-    def run_new_generation(self, genomes: List[neat.DefaultGenome], config: neat.Config) -> None:
-        self.gen += 1
+        return self.map_random().choice(self.simulation_config.map_pool)
 
+    def pick_maps(self) -> List[str]:
+        '''
+        Maps of one generation. A pool smaller than maps_per_generation repeats maps, which still differ in start angles when those are random.
+        '''
+        simulation_config: SimulationConfig = self.get_simulation_config()
+        if simulation_config.maps_per_generation <= 1:
+            return [self.pick_map()]
+        if len(simulation_config.map_pool) >= simulation_config.maps_per_generation:
+            return self.map_random().sample(simulation_config.map_pool, simulation_config.maps_per_generation)
+        return self.map_random().choices(simulation_config.map_pool, k=simulation_config.maps_per_generation)
+    
+    def setup_arguments(self, map_name: str, config: neat.Config, evaluation: int = 0) -> dict:
         arguments = {
-            "map_name": self.pick_map(),
-            "genomes": genomes, 
-            "config": config, 
+            "map_name": map_name,
             "ray_count": NeatTrainingAttempt.get_ray_count_from_config(config)}
         if self.simulation_config is not None:
             arguments["random_angle"] = self.simulation_config.random_angle
+            if self.simulation_config.seed is not None:
+                arguments["angle_seed"] = derive_seed(self.simulation_config.seed, START_ANGLE_STREAM, self.gen, evaluation)
+        return arguments
+
+    def run_new_generation(self, genomes: List[neat.DefaultGenome], config: neat.Config) -> None:
+        self.gen += 1
+
+        map_names: List[str] = self.pick_maps()
+        if len(map_names) > 1:
+            self.statistics.append(self.run_on_several_maps(genomes, config, map_names))
+            return
+
+        arguments: dict = self.setup_arguments(map_names[0], config)
+            
+        if self.evaluator is not None:
+            self.statistics.append(self.evaluator.evaluate(genomes, config, self.gen, early_stop=self.early_stop_policy(), replay_path=self.replay_path(map_names[0]), **arguments))
+            return
             
-        cars, walls, gates = setup_generation(**arguments)
+        self.statistics.append(self.run_simulation(genomes, config, arguments))
+        
+    def run_simulation(self, genomes: List[neat.DefaultGenome], config: neat.Config, arguments: dict) -> SimulationStatistics:
+        cars, walls, gates = setup_generation(genomes=genomes, config=config, **arguments)
+
+        ray_sensors: RaySensorEngine = get_map(arguments["map_name"]).ray_sensors
+
+        path: str | None = self.replay_path(arguments["map_name"])
+        replay_recorder = ReplayRecorder(path, arguments["map_name"], self.gen, len(cars)) if path is not None else None
 
-        simulation = Simulation(cars, walls, gates, self.gen, config, infinite_time=False)
-        simulation.plot_values(self.statistics)
+        simulation: Simulation | HeadlessSimulation
+        if self.headless:
+            simulation = HeadlessSimulation(cars, walls, gates, self.gen, config, infinite_time=False, ray_sensors=ray_sensors, early_stop=self.early_stop_policy(), replay_recorder=replay_recorder)
+        else:
+            simulation = Simulation(cars, walls, gates, self.gen, config, infinite_time=False, steps_per_frame=self.get_simulation_config().steps_per_frame, fast_forward=self.fast_forward, debug_ray_cars=self.get_simulation_config().debug_ray_cars, ray_sensors=ray_sensors, early_stop=self.early_stop_policy(), replay_recorder=replay_recorder)
+            simulation.plot_values(self.statistics)
         simulation.simulation_loop()   
         
-        self.statistics.append(simulation.get_statistics())
+        if isinstance(simulation, Simulation):
+            self.fast_forward = simulation.fast_forward
+            
+        profile_log: str | None = self.get_simulation_config().profile_log
+        if profile_log is not None:
+            simulation.profiler.write_summary(profile_log, self.gen)
+        
+        return simulation.get_statistics()
+    
+    def run_on_several_maps(self, genomes: List[neat.DefaultGenome], config: neat.Config, map_names: List[str]) -> SimulationStatistics:
+        '''
+        Evaluates every genome on each of the maps and combines the fitnesses with the configured reducer.
+        With a process pool all maps are evaluated at the same time in the pool. Otherwise the first map is simulated
+        as usual (in the window unless headless) while a background process simulates the rest headlessly.
+        Replays are only recorded for the first map.
+        '''
+        evaluations: List[dict] = [self.setup_arguments(map_name, config, evaluation) for evaluation, map_name in enumerate(map_names)]
+        
+        fitnesses: List[dict[int, float]]
+        if self.evaluator is not None:
+            jobs = [
+                self.evaluator.submit(genomes, config, self.gen, self.replay_path(arguments["map_name"]) if evaluation == 0 else None, early_stop=self.early_stop_policy(), **arguments)
+                for evaluation, arguments in enumerate(evaluations)]
+            fitnesses = [self.evaluator.collect(evaluation_jobs) for evaluation_jobs in jobs]
+        elif self.background_evaluator is not None:
+            background_jobs = [self.background_evaluator.submit(genomes, config, self.gen, early_stop=self.early_stop_policy(), **arguments) for arguments in evaluations[1:]]
+            self.run_simulation(genomes, config, evaluations[0])
+            fitnesses = [{genome_id: genome.fitness for genome_id, genome in genomes}]
+            fitnesses += [self.background_evaluator.collect(evaluation_jobs) for evaluation_jobs in background_jobs]
+        else:
+            self.run_simulation(genomes, config, evaluations[0])
+            fitnesses = [{genome_id: genome.fitness for genome_id, genome in genomes}]
+            fitnesses += [dict(evaluate_genomes(genomes, config, self.gen, early_stop=self.early_stop_policy(), **arguments)) for arguments in evaluations[1:]]
+            
+        scores = np.array([[evaluation[genome_id] for genome_id, _ in genomes] for evaluation in fitnesses], dtype=np.float64)
+        
+        simulation_config: SimulationConfig = self.get_simulation_config()
+        weights: List[float] | None = None
+        if simulation_config.map_weights is not None:
+            weights = [simulation_config.map_weights[simulation_config.map_pool.index(map_name)] for map_name in map_names]
+        
+        statistics = SimulationStatistics()
+        for (_, genome), fitness in zip(genomes, reduce_fitness(scores, simulation_config.fitness_reducer, weights).tolist()):
+            genome.fitness = fitness
+            statistics.add_score(fitness)
+        return statistics
         
+    def replay_path(self, map_name: str) -> str | None:
+        if not self.get_simulation_config().record_replays:
+            return None
+        return replay_path(self.filename_prefix, self.gen, map_name)
+
+    def early_stop_policy(self) -> EarlyStopPolicy:
+        simulation_config: SimulationConfig = self.get_simulation_config()
+        return EarlyStopPolicy(simulation_config.stall_ticks, simulation_config.stop_hopeless_generations, simulation_config.max_frames)
+
     def get_simulation_config(self) -> SimulationConfig:
         if self.simulation_config is not None:
             return self.simulation_config
@@ -86,6 +205,36 @@ class NeatTrainingAttempt:
             True,
             self.config.genome_config.num_inputs - NON_RAY_INPUTS, 
             self.config.pop_size)
+        
+    def checkpoint_store(self) -> CheckpointStore:
+        simulation_config: SimulationConfig = self.get_simulation_config()
+        retention = RetentionPolicy(
+            simulation_config.checkpoint_keep_last,
+            simulation_config.checkpoint_keep_every,
+            simulation_config.checkpoint_keep_best)
+        return CheckpointStore(CHECKPOINT_STORE.folder, simulation_config.checkpoint_compression, retention)
+
+    def start_evaluator(self) -> None:
+        '''
+        Genomes are evaluated headlessly in a process pool when more than one worker is configured.
+        With one worker and several maps per generation, a single background process takes the extra maps.
+        '''
+        simulation_config: SimulationConfig = self.get_simulation_config()
+        if simulation_config.workers > 1 or simulation_config.maps_per_generation > 1:
+            # loaded before forking, so the workers start with the map pool already in their registries
+            MAP_REGISTRY.preload(simulation_config.map_pool)
+        if simulation_config.workers > 1:
+            self.evaluator = ParallelGenerationEvaluator(simulation_config.workers)
+        elif simulation_config.maps_per_generation > 1:
+            self.background_evaluator = ParallelGenerationEvaluator(1)
+            
+    def stop_evaluator(self) -> None:
+        if self.evaluator is not None:
+            self.evaluator.close()
+            self.evaluator = None
+        if self.background_evaluator is not None:
+            self.background_evaluator.close()
+            self.background_evaluator = None
 
     @staticmethod
     def inject_simulation_config(config: neat.Config, simulation_config: SimulationConfig) -> neat.Config:
@@ -97,25 +246,43 @@ class NeatTrainingAttempt:
         return config
 
     def run(self, p: neat.Population, filename_prefix: str) -> None:
+        self.filename_prefix = filename_prefix
         p.add_reporter(neat.StdOutReporter(True))
-        p.add_reporter(neat.Checkpointer(1, 1, filename_prefix))   
+        checkpoint_writer = BackgroundCheckpointWriter(self.checkpoint_store())
+        p.add_reporter(CheckpointReporter(checkpoint_writer, filename_prefix))
         save_config(self.get_simulation_config(), filename_prefix)     
          
         stats = neat.StatisticsReporter()
         p.add_reporter(stats)
         
-        pg.font.init()    
-        pg.display.set_caption("Simulation - NEAT-Python")
+        if not self.headless:
+            pg.font.init()    
+            pg.display.set_caption("Simulation - NEAT-Python")
+            
+        self.start_evaluator()
 
         try:
             winner = p.run(self.run_new_generation, 500)
 
             print(winner)
-        except BreakTrainingException:
+        except (BreakTrainingException, KeyboardInterrupt):
             print("Training ended.")
             pg.quit()
+        finally:
+            self.stop_evaluator()
+            checkpoint_writer.close()
             
+    def seed_neat(self) -> None:
+        '''
+        NEAT draws from the global random module, which becomes the NEAT stream of a seeded run.
+        Map choice and start angles have their own streams, so they do not shift the numbers NEAT gets.
+        '''
+        seed: int | None = self.get_simulation_config().seed
+        if seed is not None:
+            random.seed(derive_seed(seed, NEAT_STREAM))
+
     def default_run(self) -> None:
+        self.seed_neat()
         p = neat.Population(self.config)
         
         cur_date: datetime = datetime.now()
@@ -124,7 +291,7 @@ class NeatTrainingAttempt:
         self.run(p, filename_prefix)        
         
     def load_run(self, checkpoint_filename: str) -> None:
-        p: neat.Population = neat.Checkpointer.restore_checkpoint(checkpoint_filename)
+        p: neat.Population = CHECKPOINT_STORE.restore(checkpoint_filename)
         
         timestamp: str = get_timestamp(checkpoint_filename)
         filename_prefix: str = timestamp + NEAT_INFIX
@@ -136,18 +303,18 @@ class NeatTrainingAttempt:
         
         self.run(p, filename_prefix)       
 
-def load_checkpoint(simulation_config: SimulationConfig, checkpoint_filename) -> None:    
+def load_checkpoint(simulation_config: SimulationConfig, checkpoint_filename, headless: bool = False) -> None:    
     local_dir: str = os.path.dirname(__file__)
     config_path: str = os.path.join(local_dir, "config")
     
-    neat_run = NeatTrainingAttempt(config_path, simulation_config)
+    neat_run = NeatTrainingAttempt(config_path, simulation_config, headless)
     neat_run.load_run(checkpoint_filename)
 
-def main(simulation_config: Optional[SimulationConfig] = None) -> None:    
+def main(simulation_config: Optional[SimulationConfig] = None, headless: bool = False) -> None:    
     local_dir: str = os.path.dirname(__file__)
     config_path: str = os.path.join(local_dir, "config")
     
-    neat_run = NeatTrainingAttempt(config_path, simulation_config)
+    neat_run = NeatTrainingAttempt(config_path, simulation_config, headless)
     neat_run.default_run()
 
 if __name__ == "__main__":    
@@ -0,0 +1,60 @@
+import pygame as pg
+from typing import Iterable, List
+
+DEFAULT_MAX_RECTS: int = 150
+DEFAULT_MAX_AREA_FRACTION: float = 0.4
+
+class DirtyRectTracker:
+    '''
+    Collects the areas of the window that were drawn on during a frame and updates only those on the display.
+
+    A frame updates the areas drawn on in it and in the previous frame, so whatever moved away gets erased.
+    When there are more than max_rects areas, or they cover more than max_area_fraction of the window,
+    a full update is cheaper than updating them one by one and is done instead.
+    invalidate() forces a full update for the next frame, for changes that are not drawn as areas (a new map, a debug toggle).
+    '''
+    def __init__(self, size: tuple[int, int], max_rects: int = DEFAULT_MAX_RECTS, max_area_fraction: float = DEFAULT_MAX_AREA_FRACTION) -> None:
+        self.screen_rect = pg.Rect((0, 0), size)
+        self.max_rects: int = max_rects
+        self.max_area: float = max_area_fraction * size[0] * size[1]
+
+        self.rects: List[pg.Rect] = []
+        self.previous_rects: List[pg.Rect] = []
+        self.area: int = 0
+        self.previous_area: int = 0
+        self.full_update: bool = True
+        self.full_update_count: int = 0
+        self.partial_update_count: int = 0
+
+    def invalidate(self) -> None:
+        self.full_update = True
+
+    def add(self, rect: pg.Rect | None) -> None:
+        if rect is None:
+            return
+        rect = rect.clip(self.screen_rect)
+        if rect.width > 0 and rect.height > 0:
+            self.rects.append(rect)
+            self.area += rect.width * rect.height
+
+    def add_all(self, rects: Iterable[pg.Rect | None]) -> None:
+        for rect in rects:
+            self.add(rect)
+
+    def update(self) -> None:
+        '''
+        Pushes this frame to the display and starts collecting the next one.
+        '''
+        full_update: bool = (self.full_update
+                             or len(self.rects) + len(self.previous_rects) > self.max_rects
+                             or self.area + self.previous_area > self.max_area)
+        if full_update:
+            pg.display.update()
+            self.full_update_count += 1
+        else:
+            pg.display.update(self.previous_rects + self.rects)
+            self.partial_update_count += 1
+
+        self.previous_rects, self.previous_area = self.rects, self.area
+        self.rects, self.area = [], 0
+        self.full_update = False
@@ -4,6 +4,7 @@ from typing import Callable
 from abc import ABC, abstractmethod
 from pygame.font import Font
 from simulation.pygame_plot import py_plot
+from pygame_extensions.text_cache import TEXT_CACHE
 
 pg.font.init()
 
@@ -16,7 +17,10 @@ BORDER_SIZE = 2
 
 class PyUiElement(ABC):    
     @abstractmethod    
-    def draw(self, screen) -> None:
+    def draw(self, screen) -> pg.Rect:
+        '''
+        Returns the area that was drawn on.
+        '''
         ...
         
     @abstractmethod
@@ -33,7 +37,7 @@ class PyInputBox(PyUiElement):
         self.color: pg.Color = COLOR_INACTIVE
         self.tooltip: str = tooltip
         self.text: str = ""
-        self.txt_surface: pg.Surface = FONT.render(tooltip, True, self.color)
+        self.txt_surface: pg.Surface = TEXT_CACHE.render(FONT, tooltip, True, self.color)
         self.active: bool = False
         self.update_width()        
 
@@ -68,22 +72,22 @@ class PyInputBox(PyUiElement):
     
     def render_text(self):
         if not self.showing_tooltip:
-            self.txt_surface = FONT.render(self.text, True, self.color)
+            self.txt_surface = TEXT_CACHE.render(FONT, self.text, True, self.color)
         else:
-            self.txt_surface = FONT.render(self.tooltip, True, TOOLTIP_COLOR)
+            self.txt_surface = TEXT_CACHE.render(FONT, self.tooltip, True, TOOLTIP_COLOR)
                 
     def set_active(self, active: bool) -> None:
         self.active = active
         self.color = COLOR_ACTIVE if self.active else COLOR_INACTIVE
-        self.txt_surface = FONT.render(self.text, True, self.color)
+        self.txt_surface = TEXT_CACHE.render(FONT, self.text, True, self.color)
 
     def update_width(self) -> None:
         width: int = max(self.default_width, self.txt_surface.get_width()+10)
         self.rect.w = width
 
-    def draw(self, screen) -> None:
-        screen.blit(self.txt_surface, (self.rect.x+5, self.rect.y+5))
-        pg.draw.rect(screen, self.color, self.rect, 2)
+    def draw(self, screen) -> pg.Rect:
+        text_rect: pg.Rect = screen.blit(self.txt_surface, (self.rect.x+5, self.rect.y+5))
+        return pg.draw.rect(screen, self.color, self.rect, 2).union(text_rect)
         
 class PyButton(PyUiElement):
     def __init__(self, text: str, x: float, y: float, width: float, height: float, color, hover_color, font_color, font: Font) -> None:
@@ -97,17 +101,18 @@ class PyButton(PyUiElement):
         self.action: Callable[[], None]
         self.is_button_hovering = False
     
-    def draw(self, surface) -> None:
-        pg.draw.rect(surface, self.color, self.rect_border, 2)
+    def draw(self, surface) -> pg.Rect:
+        border_rect: pg.Rect = pg.draw.rect(surface, self.color, self.rect_border, 2)
         if self.is_button_hovering:
             pg.draw.rect(surface, self.hover_color, self.rect)
         else:
             pg.draw.rect(surface, self.color, self.rect)
             
         if self.text:        
-            text_surface: pg.Surface = self.font.render(self.text, True, self.font_color)
+            text_surface: pg.Surface = TEXT_CACHE.render(self.font, self.text, True, self.font_color)
             text_rect: pg.Rect = text_surface.get_rect(center=self.rect.center)
             surface.blit(text_surface, text_rect)
+        return border_rect
         
     def connect(self, action) -> None:
         self.action = action
@@ -141,9 +146,9 @@ class PyImage(PyUiElement):
     def handle_event(self, _) -> bool:
         return False
         
-    def draw(self, screen) -> None:      
+    def draw(self, screen) -> pg.Rect:      
         y: float = self.bottom_y - self.image.get_height()     
-        screen.blit(self.image, (self.bottom_x, y))
+        return screen.blit(self.image, (self.bottom_x, y))
     
 class PyPlot(PyUiElement):
     def __init__(self, x_right: float, y_bottom: float, width: float, height: float, *values_to_plot: list[float]):
@@ -151,8 +156,8 @@ class PyPlot(PyUiElement):
         self.y_bottom: float = y_bottom
         self.plot: Surface = py_plot(width, height, *values_to_plot)
         
-    def draw(self, screen):
-        screen.blit(self.plot, (self.x_right - self.plot.get_width(), self.y_bottom - self.plot.get_height()))
+    def draw(self, screen) -> pg.Rect:
+        return screen.blit(self.plot, (self.x_right - self.plot.get_width(), self.y_bottom - self.plot.get_height()))
         
     def handle_event(self, _) -> bool:
         return False
@@ -194,7 +199,7 @@ class PyScrollView(PyUiElement):
         self.needed_height += element_height
         self.scrollable_area = pg.Surface((self.rect.width, max(self.needed_height, self.rect.height)))
 
-    def draw(self, screen) -> None:
+    def draw(self, screen) -> pg.Rect:
         self.scrollable_area.fill((255, 255, 255))
 
         for element in self.elements:
@@ -203,4 +208,5 @@ class PyScrollView(PyUiElement):
         visible_area: Surface = self.scrollable_area.subsurface(pg.Rect(0, self.scroll_offset, self.rect.width, self.rect.height))
 
         screen.blit(visible_area, (self.rect.x, self.rect.y))
-        pg.draw.rect(screen, (0, 0, 0), self.rect, 2)
\ No newline at end of file
+        pg.draw.rect(screen, (0, 0, 0), self.rect, 2)
+        return self.rect.copy()
\ No newline at end of file
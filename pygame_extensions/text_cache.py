@@ -0,0 +1,44 @@
+import pygame as pg
+from collections import OrderedDict
+from pygame.font import Font
+from pygame.surface import Surface
+from typing import Tuple
+
+DEFAULT_CACHE_SIZE: int = 512
+
+TextKey = Tuple[Font, str, bool, Tuple[int, ...]]
+
+class TextRenderCache:
+    '''
+    Rendered strings by font, text, antialiasing and colour, so text that stays the same between frames is rendered once.
+    The least recently used strings are dropped when there are more than max_size of them.
+
+    The returned surfaces are shared, so blit them but do not draw on them.
+    '''
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        if max_size < 1:
+            raise ValueError("Text cache has to hold at least one string")
+        self.max_size: int = max_size
+        self.surfaces: OrderedDict[TextKey, Surface] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def render(self, font: Font, text: str, antialias: bool, color) -> Surface:
+        key: TextKey = (font, text, antialias, tuple(pg.Color(color)))
+        surface: Surface | None = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        self.surfaces.clear()
+
+TEXT_CACHE = TextRenderCache()
@@ -0,0 +1,86 @@
+import dataclasses
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from simulation.simulation_config import SimulationConfig
+
+MANIFEST_VERSION: int = 1
+MANIFEST_FILENAME_END: str = "manifest.json"
+
+def config_to_dict(simulation_config: SimulationConfig) -> dict:
+    return dataclasses.asdict(simulation_config)
+
+def config_from_dict(values: dict) -> SimulationConfig:
+    '''
+    Ignores settings this version does not know and uses the defaults for the ones missing in the file.
+    '''
+    fields: set[str] = {field.name for field in dataclasses.fields(SimulationConfig)}
+    return SimulationConfig(**{name: value for name, value in values.items() if name in fields})
+
+class RunManifest:
+    '''
+    Everything known about one training run that does not need its populations:
+    the simulation config, the best fitness of every generation and the checkpoints still stored.
+    Kept as a small JSON file next to the checkpoints of the run.
+    '''
+    def __init__(self, timestamp: str, simulation_config: SimulationConfig, created: Optional[str] = None,
+                 best_fitness: Optional[Dict[int, float | None]] = None, checkpoints: Optional[List[str]] = None) -> None:
+        self.timestamp: str = timestamp
+        self.simulation_config: SimulationConfig = simulation_config
+        self.created: str = created if created is not None else datetime.now().isoformat(timespec="seconds")
+        self.best_fitness: Dict[int, float | None] = best_fitness if best_fitness is not None else {}
+        self.checkpoints: List[str] = checkpoints if checkpoints is not None else []
+
+    @property
+    def generations(self) -> int:
+        return max(self.best_fitness) + 1 if self.best_fitness else 0
+
+    @property
+    def overall_best_fitness(self) -> float | None:
+        scores: List[float] = [score for score in self.best_fitness.values() if score is not None]
+        return max(scores) if scores else None
+
+    def summary(self) -> str:
+        best_fitness: float | None = self.overall_best_fitness
+        return (f"{self.timestamp}: maps {', '.join(self.simulation_config.map_pool)}, "
+                f"population {self.simulation_config.initial_population}, {self.generations} generations, "
+                f"best fitness {'-' if best_fitness is None else f'{best_fitness:.1f}'}, {len(self.checkpoints)} checkpoints")
+
+    def record_generation(self, generation: int, best_fitness: float | None) -> None:
+        self.best_fitness[generation] = best_fitness
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "timestamp": self.timestamp,
+            "created": self.created,
+            "map_pool": list(self.simulation_config.map_pool),
+            "population": self.simulation_config.initial_population,
+            "config": config_to_dict(self.simulation_config),
+            "best_fitness": [{"generation": generation, "best_fitness": score} for generation, score in sorted(self.best_fitness.items())],
+            "checkpoints": self.checkpoints,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "RunManifest":
+        version = data.get("version")
+        if not isinstance(version, int) or version > MANIFEST_VERSION:
+            raise ValueError(f"Unsupported run manifest version {version}")
+        return RunManifest(
+            data["timestamp"],
+            config_from_dict(data["config"]),
+            data.get("created"),
+            {entry["generation"]: entry["best_fitness"] for entry in data.get("best_fitness", [])},
+            list(data.get("checkpoints", [])))
+
+    def write(self, path: str) -> None:
+        temporary_path: str = path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=1)
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def read(path: str) -> "RunManifest":
+        with open(path, "r") as file:
+            return RunManifest.from_dict(json.load(file))
@@ -0,0 +1,78 @@
+import math
+from pygame.math import Vector2
+from typing import List
+from cars.car import ACCELERATION, SPEED_DAMPING
+from map_scripts.map import Gate, GATE_TOLERANCE
+
+# cars start at rest and full throttle converges to this speed, per tick of movement
+TERMINAL_SPEED: float = ACCELERATION * SPEED_DAMPING / (1 - SPEED_DAMPING)
+# the speed reward is given before damping, so it is bounded by the undamped terminal speed
+MAX_REWARDED_SPEED: float = ACCELERATION / (1 - SPEED_DAMPING)
+# a pass counts anywhere in the gate box widened by GATE_TOLERANCE, whose corners are this far from the gate
+GATE_PASS_MARGIN: float = math.sqrt(2) * GATE_TOLERANCE
+
+def point_segment_distance(point: Vector2, start: Vector2, end: Vector2) -> float:
+    segment: Vector2 = end - start
+    if segment.length_squared() == 0:
+        return point.distance_to(start)
+    t: float = max(0, min(1, (point - start).dot(segment) / segment.length_squared()))
+    return point.distance_to(start + segment * t)
+
+def gate_gap(gate: Gate, other: Gate) -> float:
+    '''
+    Shortest distance between two gates, 0 if they cross.
+    '''
+    p1, p2, q1, q2 = gate.start_position, gate.end_position, other.start_position, other.end_position
+    d1, d2 = p2 - p1, q2 - q1
+    denominator: float = d1.cross(d2)
+    if denominator != 0:
+        s: float = (q1 - p1).cross(d2) / denominator
+        t: float = (q1 - p1).cross(d1) / denominator
+        if 0 <= s <= 1 and 0 <= t <= 1:
+            return 0
+    return min(
+        point_segment_distance(p1, q1, q2),
+        point_segment_distance(p2, q1, q2),
+        point_segment_distance(q1, p1, p2),
+        point_segment_distance(q2, p1, p2))
+
+def minimum_gate_gap(gates: List[Gate]) -> float:
+    '''
+    Shortest distance a car has to travel between passing a gate and passing the next one, in either direction.
+    Both passes can happen up to GATE_PASS_MARGIN away from their gates, so that is taken off the gap between them.
+    '''
+    if len(gates) == 0:
+        return math.inf
+    if len(gates) == 1:
+        return 0
+    return max(0, min(gate_gap(gate, next_gate) for gate, next_gate in zip(gates, gates[1:] + gates[:1])) - 2 * GATE_PASS_MARGIN)
+
+class EarlyStopPolicy:
+    '''
+    Rules for ending cars and generations before the regular frame limit.
+
+    stall_ticks: cars that have not passed a gate for this many ticks are killed.
+    Gate progress is used rather than fitness, which keeps growing for a car driving in circles.
+
+    stop_hopeless: the generation ends once no living car can reach the best score of the dead cars,
+    even when driving at terminal speed and passing a gate as often as the gate spacing allows.
+
+    max_frames: caps the frames of every generation, independent of the generation number.
+    '''
+    def __init__(self, stall_ticks: int | None = None, stop_hopeless: bool = False, max_frames: int | None = None) -> None:
+        self.stall_ticks: int | None = stall_ticks
+        self.stop_hopeless: bool = stop_hopeless
+        self.max_frames: int | None = max_frames
+
+    @property
+    def is_active(self) -> bool:
+        return self.stall_ticks is not None or self.stop_hopeless or self.max_frames is not None
+
+    @staticmethod
+    def max_score_gain(ticks: int, gate_gap: float, ticks_per_second: int, gate_reward: float) -> float:
+        if ticks <= 0:
+            return 0
+        if gate_gap <= 0:
+            return math.inf
+        gates_passed: float = math.floor(ticks * TERMINAL_SPEED / gate_gap) + 1 if math.isfinite(gate_gap) else 0
+        return ticks * MAX_REWARDED_SPEED / ticks_per_second + gates_passed * gate_reward
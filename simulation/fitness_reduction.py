@@ -0,0 +1,31 @@
+import numpy as np
+from typing import Sequence
+
+FITNESS_REDUCERS: tuple[str, ...] = ("mean", "min", "weighted")
+
+def reduce_fitness(scores: np.ndarray, reducer: str = "mean", weights: Sequence[float] | None = None) -> np.ndarray:
+    '''
+    Combines the fitness of every genome over several evaluations.
+    scores is an (evaluations, genomes) array, weights has one weight per evaluation and is only used by "weighted".
+    '''
+    if reducer == "mean":
+        return scores.mean(axis=0)
+    if reducer == "min":
+        return scores.min(axis=0)
+    if reducer == "weighted":
+        evaluation_weights = np.ones(len(scores)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if len(evaluation_weights) != len(scores) or (evaluation_weights < 0).any() or evaluation_weights.sum() <= 0:
+            raise ValueError("Weighted fitness needs one non-negative weight per evaluation with a positive sum")
+        return np.average(scores, axis=0, weights=evaluation_weights)
+    raise ValueError(f"Unknown fitness reducer {reducer}, expected one of {', '.join(FITNESS_REDUCERS)}")
+
+def check_map_weights(map_weights: Sequence[float] | None, map_pool: Sequence[str]) -> None:
+    '''
+    Raises before training when the weights of the "weighted" reducer cannot be used with the map pool.
+    '''
+    if map_weights is None:
+        return
+    if len(map_weights) != len(map_pool):
+        raise ValueError(f"Expected one map weight per map in the pool ({len(map_pool)}), got {len(map_weights)}")
+    if any(weight < 0 for weight in map_weights) or sum(map_weights) <= 0:
+        raise ValueError("Map weights must be non-negative with a positive sum")
@@ -0,0 +1,81 @@
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, List
+
+ROLLING_WINDOW_FRAMES: int = 120
+
+class FrameProfiler:
+    '''
+    Splits the time of every frame into named phases.
+
+    mark(phase) charges the time since the previous mark (or the frame start) to the phase,
+    which costs one perf_counter call, so the profiler stays on all the time.
+    Keeps a rolling window of recent frames for the overlay and totals for the whole generation.
+    '''
+    def __init__(self, window: int = ROLLING_WINDOW_FRAMES) -> None:
+        self._last_mark: float = time.perf_counter()
+        self._frame: Dict[str, float] = {}
+
+        self._recent_frames: Deque[Dict[str, float]] = deque()
+        self._window: int = window
+        self._recent_totals: Dict[str, float] = {}
+
+        self.frame_count: int = 0
+        self.totals: Dict[str, float] = {}
+        self.maxima: Dict[str, float] = {}
+
+    def start_frame(self) -> None:
+        self._frame = {}
+        self._last_mark = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        now: float = time.perf_counter()
+        self._frame[phase] = self._frame.get(phase, 0) + now - self._last_mark
+        self._last_mark = now
+
+    def end_frame(self) -> None:
+        frame: Dict[str, float] = self._frame
+        self.frame_count += 1
+
+        for phase, seconds in frame.items():
+            self.totals[phase] = self.totals.get(phase, 0) + seconds
+            self.maxima[phase] = max(self.maxima.get(phase, 0), seconds)
+            self._recent_totals[phase] = self._recent_totals.get(phase, 0) + seconds
+
+        self._recent_frames.append(frame)
+        if len(self._recent_frames) > self._window:
+            for phase, seconds in self._recent_frames.popleft().items():
+                self._recent_totals[phase] -= seconds
+
+    def rolling_breakdown(self) -> List[tuple[str, float]]:
+        '''
+        Mean milliseconds per frame of every phase over the recent frames, slowest first.
+        '''
+        if not self._recent_frames:
+            return []
+        frames: int = len(self._recent_frames)
+        breakdown = [(phase, seconds * 1000 / frames) for phase, seconds in self._recent_totals.items()]
+        return sorted(breakdown, key=lambda item: item[1], reverse=True)
+
+    def summary(self) -> dict:
+        frames: int = max(self.frame_count, 1)
+        return {
+            "frames": self.frame_count,
+            "total_ms": sum(self.totals.values()) * 1000,
+            "phases": {
+                phase: {
+                    "total_ms": seconds * 1000,
+                    "mean_ms": seconds * 1000 / frames,
+                    "max_ms": self.maxima[phase] * 1000,
+                }
+                for phase, seconds in self.totals.items()
+            },
+        }
+
+    def write_summary(self, filename: str, generation_number: int) -> None:
+        '''
+        Appends the summary of the generation as one JSON line.
+        '''
+        with open(filename, "a") as file:
+            file.write(json.dumps({"generation": generation_number, **self.summary()}) + "\n")
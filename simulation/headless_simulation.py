@@ -0,0 +1,13 @@
+from simulation.simulation_engine import SimulationEngine
+
+class HeadlessSimulation(SimulationEngine):
+    '''
+    Runs the same physics, sensing, rewards and death rules as Simulation,
+    but never opens a window and is not throttled to the display frame rate.
+    '''
+    def simulation_loop(self) -> None:
+        while self.is_running():
+            self.profiler.start_frame()
+            self.simulation_step()
+            self.profiler.end_frame()
+        self.end_simulation()
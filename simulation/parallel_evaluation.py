@@ -0,0 +1,70 @@
+import multiprocessing
+from multiprocessing.pool import AsyncResult
+import random
+import neat # type: ignore
+from typing import List
+from simulation.simulation_setup import setup_generation
+from map_scripts.map_registry import get_map
+from simulation.headless_simulation import HeadlessSimulation
+from simulation.early_stopping import EarlyStopPolicy
+from simulation.statistics import SimulationStatistics
+from simulation.replay import ReplayRecorder, shard_path
+
+def _initialize_worker() -> None:
+    # forked workers inherit the parent's random state, so every shard would get the same start angles
+    random.seed()
+
+def evaluate_genomes(genomes: List[tuple[int, neat.DefaultGenome]], config: neat.Config, generation_number: int, early_stop: EarlyStopPolicy | None = None, replay_path: str | None = None, **setup_arguments) -> List[tuple[int, float]]:
+    cars, walls, gates = setup_generation(genomes=genomes, config=config, **setup_arguments)
+
+    ray_sensors = get_map(setup_arguments["map_name"]).ray_sensors
+    replay_recorder = ReplayRecorder(replay_path, setup_arguments["map_name"], generation_number, len(cars)) if replay_path is not None else None
+    simulation = HeadlessSimulation(cars, walls, gates, generation_number, config, infinite_time=False, ray_sensors=ray_sensors, early_stop=early_stop, replay_recorder=replay_recorder)
+    simulation.simulation_loop()
+
+    return [(genome_id, genome.fitness) for genome_id, genome in genomes]
+
+class ParallelGenerationEvaluator:
+    '''
+    Shards the genomes of a generation across a process pool. Every worker builds
+    its own cars and walls with setup_generation and simulates them headlessly.
+    '''
+    def __init__(self, workers: int) -> None:
+        if workers < 1:
+            raise ValueError("Worker count must be at least 1")
+        self.workers: int = workers
+        self.pool = multiprocessing.Pool(workers, initializer=_initialize_worker)
+
+    def shard(self, genomes: List[tuple[int, neat.DefaultGenome]]) -> List[List[tuple[int, neat.DefaultGenome]]]:
+        shards = [genomes[i::self.workers] for i in range(self.workers)]
+        return [shard for shard in shards if shard]
+
+    def submit(self, genomes: List[tuple[int, neat.DefaultGenome]], config: neat.Config, generation_number: int, replay_path: str | None = None, **setup_arguments) -> List[AsyncResult]:
+        '''
+        Starts evaluating the genomes without waiting, so that several evaluations can share the pool.
+        With a replay path every shard records its cars into its own replay, numbered after the shard.
+        '''
+        return [
+            self.pool.apply_async(evaluate_genomes, (shard, config, generation_number), dict(setup_arguments, replay_path=shard_path(replay_path, index) if replay_path is not None else None))
+            for index, shard in enumerate(self.shard(genomes))]
+
+    @staticmethod
+    def collect(jobs: List[AsyncResult]) -> dict[int, float]:
+        fitnesses: dict[int, float] = {}
+        for job in jobs:
+            fitnesses.update(job.get())
+        return fitnesses
+
+    def evaluate(self, genomes: List[tuple[int, neat.DefaultGenome]], config: neat.Config, generation_number: int, replay_path: str | None = None, **setup_arguments) -> SimulationStatistics:
+        fitnesses: dict[int, float] = self.collect(self.submit(genomes, config, generation_number, replay_path, **setup_arguments))
+
+        statistics = SimulationStatistics()
+        for genome_id, genome in genomes:
+            genome.fitness = fitnesses[genome_id]
+            statistics.add_score(genome.fitness)
+
+        return statistics
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
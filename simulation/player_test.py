@@ -1,6 +1,6 @@
 from typing import List, Callable
 from simulation.simulation_setup import spawn_player_cars, generate_rays, find_angle_to_first_gate
-from map_scripts.map_reader import read_map_txt as setup_map
+from map_scripts.map_reader import read_map as setup_map
 from map_scripts.map_tools import DEFAULT_MAP
 from simulation.simulation import Simulation, BreakTrainingException
 from cars.car import Car
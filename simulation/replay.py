@@ -0,0 +1,102 @@
+import os
+import struct
+import numpy as np
+from typing import BinaryIO, List
+from cars.car_population import CarPopulation
+
+REPLAY_FOLDER: str = "replays"
+REPLAY_EXTENSION: str = ".replay"
+
+REPLAY_MAGIC: bytes = b"SLCR"
+REPLAY_VERSION: int = 1
+# magic, version, generation, car count, length of the map name that follows the header
+REPLAY_HEADER = struct.Struct("<4sHIIH")
+
+def tick_dtype(car_count: int) -> np.dtype:
+    '''
+    One fixed size record per tick, so a replay can be memory-mapped and played from any tick.
+    '''
+    return np.dtype([
+        ("positions", "<f4", (car_count, 2)),
+        ("angles", "<f4", (car_count,)),
+        ("scores", "<f4", (car_count,)),
+        ("alive", "u1", ((car_count + 7) // 8,)),
+    ])
+
+def replay_path(filename_prefix: str, generation: int, map_name: str, folder: str = REPLAY_FOLDER) -> str:
+    return os.path.join(folder, f"{os.path.basename(filename_prefix)}{generation}-{os.path.splitext(map_name)[0]}{REPLAY_EXTENSION}")
+
+def shard_path(path: str, shard: int) -> str:
+    stem, extension = os.path.splitext(path)
+    return f"{stem}-{shard}{extension}"
+
+class ReplayRecorder:
+    '''
+    Writes the state of every car after each tick of a simulation (position, angle, alive and score)
+    into a binary trace, which ReplayViewer plays back without sensing or running networks again.
+    '''
+    def __init__(self, path: str, map_name: str, generation: int, car_count: int) -> None:
+        self.path: str = path
+        self.car_count: int = car_count
+        self.tick = np.zeros(1, dtype=tick_dtype(car_count))
+        self.ticks: int = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        encoded_map_name: bytes = map_name.encode()
+        self.file: BinaryIO | None = open(path, "wb")
+        self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, generation, car_count, len(encoded_map_name)))
+        self.file.write(encoded_map_name)
+
+    def record(self, population: CarPopulation) -> None:
+        if self.file is None:
+            return
+        tick = self.tick[0]
+        tick["positions"] = population.positions
+        tick["angles"] = population.angles
+        tick["scores"] = population.fitness
+        tick["alive"] = np.packbits(population.alive)
+        self.file.write(self.tick.tobytes())
+        self.ticks += 1
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class Replay:
+    '''
+    A recorded trace, memory-mapped so that opening it does not read the ticks.
+    '''
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(path, "rb") as file:
+            magic, version, generation, car_count, map_name_length = REPLAY_HEADER.unpack(file.read(REPLAY_HEADER.size))
+            if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+                raise ValueError(f"{path} is not a replay of a supported version")
+            self.map_name: str = file.read(map_name_length).decode()
+        self.generation: int = generation
+        self.car_count: int = car_count
+
+        offset: int = REPLAY_HEADER.size + map_name_length
+        dtype: np.dtype = tick_dtype(car_count)
+        # a trace cut short, for example by ending the training, still plays up to its last complete tick
+        self.tick_count: int = (os.path.getsize(path) - offset) // dtype.itemsize
+        self.ticks: np.ndarray = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(self.tick_count,)) if self.tick_count > 0 else np.zeros(0, dtype=dtype)
+
+    def positions(self, tick: int) -> np.ndarray:
+        return self.ticks[tick]["positions"]
+
+    def angles(self, tick: int) -> np.ndarray:
+        return self.ticks[tick]["angles"]
+
+    def scores(self, tick: int) -> np.ndarray:
+        return self.ticks[tick]["scores"]
+
+    def alive(self, tick: int) -> np.ndarray:
+        return np.unpackbits(self.ticks[tick]["alive"], count=self.car_count).astype(bool)
+
+def load_replays(paths: List[str]) -> List[Replay]:
+    replays: List[Replay] = [Replay(path) for path in paths]
+    if len({replay.map_name for replay in replays}) > 1:
+        raise ValueError("Replays played together have to be recorded on the same map")
+    return replays
@@ -0,0 +1,121 @@
+import pygame as pg
+import numpy as np
+from typing import List
+from cars.car import CAR_SPRITES
+from map_scripts.map_registry import LoadedMap, get_map
+from simulation.replay import Replay, load_replays
+from map_scripts.map_layer import MapLayer
+from pygame_extensions.dirty_rects import DirtyRectTracker
+from simulation.simulation import WIDTH, HEIGHT, BG_IMG, USE_BG_IMG, BG_COLOR
+from simulation.simulation_engine import TICKS_PER_SECOND
+from simulation.simulation_ui import PyReplayUi
+
+PAUSE_KEY = pg.K_SPACE
+FASTER_KEY = pg.K_UP
+SLOWER_KEY = pg.K_DOWN
+SEEK_BACK_KEY = pg.K_LEFT
+SEEK_FORWARD_KEY = pg.K_RIGHT
+RESTART_KEY = pg.K_HOME
+
+SEEK_TICKS: int = TICKS_PER_SECOND
+MIN_SPEED: float = 1 / 16
+MAX_SPEED: float = 256
+
+class ReplayViewer:
+    '''
+    Plays recorded replays of one generation at any speed, drawing the recorded car states without simulating anything.
+    Several replays (the shards of a generation evaluated by a process pool) are played on top of each other.
+
+    Space pauses, up and down double and halve the speed, left and right seek by a second, home restarts.
+    '''
+    def __init__(self, replays: List[Replay], speed: float = 1) -> None:
+        if not replays:
+            raise ValueError("Nothing to replay")
+        self.replays: List[Replay] = replays
+        self.loaded_map: LoadedMap = get_map(replays[0].map_name)
+        self.speed: float = min(max(speed, MIN_SPEED), MAX_SPEED)
+        self.tick_position: float = 0
+        self.paused: bool = False
+        self.running: bool = True
+
+        self.win: pg.surface.Surface = pg.display.set_mode((WIDTH, HEIGHT))
+        pg.display.set_caption(f"Replay - generation {replays[0].generation} on {replays[0].map_name}")
+        self.replay_ui = PyReplayUi(self.win, self.stop, self.toggle_pause)
+        self.dirty_rects = DirtyRectTracker((WIDTH, HEIGHT))
+        self.map_layer = MapLayer((WIDTH, HEIGHT), self.loaded_map.walls, self.loaded_map.gates, BG_IMG if USE_BG_IMG else None, BG_COLOR)
+
+    @property
+    def tick_count(self) -> int:
+        return max(replay.tick_count for replay in self.replays)
+
+    @property
+    def tick(self) -> int:
+        return int(self.tick_position)
+
+    def stop(self) -> None:
+        self.running = False
+
+    def toggle_pause(self) -> None:
+        self.paused = not self.paused
+        self.replay_ui.set_paused(self.paused)
+
+    def seek(self, ticks: float) -> None:
+        self.tick_position = min(max(self.tick_position + ticks, 0), max(self.tick_count - 1, 0))
+
+    def process_input(self) -> None:
+        for event in pg.event.get():
+            if event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
+                self.stop()
+            if event.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED):
+                self.dirty_rects.invalidate()
+            if event.type == pg.KEYDOWN:
+                if event.key == PAUSE_KEY:
+                    self.toggle_pause()
+                elif event.key == FASTER_KEY:
+                    self.speed = min(self.speed * 2, MAX_SPEED)
+                elif event.key == SLOWER_KEY:
+                    self.speed = max(self.speed / 2, MIN_SPEED)
+                elif event.key == SEEK_BACK_KEY:
+                    self.seek(-SEEK_TICKS)
+                elif event.key == SEEK_FORWARD_KEY:
+                    self.seek(SEEK_TICKS)
+                elif event.key == RESTART_KEY:
+                    self.tick_position = 0
+            self.replay_ui.handle_event(event)
+
+    def draw(self) -> None:
+        self.map_layer.draw_background(self.win)
+
+        alive_count: int = 0
+        best_score: float = 0
+        for replay in self.replays:
+            # a shard whose cars all died earlier stays on its last tick
+            tick: int = min(self.tick, replay.tick_count - 1)
+            if tick < 0:
+                continue
+            alive: np.ndarray = replay.alive(tick)
+            positions: np.ndarray = replay.positions(tick)[alive]
+            self.dirty_rects.add_all(CAR_SPRITES.draw(self.win, positions, replay.angles(tick)[alive]))
+            alive_count += len(positions)
+            if replay.car_count > 0:
+                best_score = max(best_score, float(replay.scores(tick).max()))
+
+        self.map_layer.draw_walls(self.win)
+
+        self.dirty_rects.add_all(self.replay_ui.draw())
+        self.dirty_rects.add_all(self.replay_ui.draw_replay_info(self.tick, self.tick_count, self.speed, alive_count, best_score, self.replays[0].generation, WIDTH - 10))
+
+    def play(self) -> None:
+        clock = pg.time.Clock()
+        while self.running:
+            clock.tick(TICKS_PER_SECOND)
+            self.process_input()
+            if not self.paused:
+                self.seek(self.speed)
+            self.draw()
+            self.dirty_rects.update()
+
+def play_replays(paths: List[str], speed: float = 1) -> None:
+    pg.font.init()
+    ReplayViewer(load_replays(paths), speed).play()
+    pg.quit()
@@ -0,0 +1,17 @@
+import hashlib
+import random
+
+MAP_STREAM: str = "maps"
+START_ANGLE_STREAM: str = "start-angles"
+NEAT_STREAM: str = "neat"
+
+def derive_seed(seed: int, stream: str, *keys: int) -> int:
+    '''
+    Seed of one random stream of a seeded run, optionally narrowed down by keys such as the generation.
+    Streams are independent, so drawing more numbers from one never changes the numbers of another.
+    '''
+    text: str = ":".join(str(part) for part in (seed, stream, *keys))
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+def random_stream(seed: int, stream: str, *keys: int) -> random.Random:
+    return random.Random(derive_seed(seed, stream, *keys))
@@ -1,16 +1,27 @@
 import os
+import time
+import numpy as np
 import pygame as pg
 from pygame.font import Font
 from pygame.math import Vector2
 from typing import List, Sequence
 from pygame_extensions.pyui_elements import PyButton
 from pygame.surface import Surface
-from cars.car import Car, AICar
+from cars.car import Car, AICar, CAR_SPRITES
 import neat_visualization.visualize as visualize
 from simulation.simulation_ui import PySimulationUi, PyNeatSimulationUi, PyTestUi
 from simulation.statistics import SimulationStatistics
 from map_scripts.map_tools import get_map_names
-from map_scripts.map_reader import read_map_txt
+from map_scripts.map_registry import LoadedMap, get_map
+from cars.ray_sensors import RaySensorEngine
+from cars.ray_overlay import RayDebugOverlay
+from simulation.simulation_engine import SimulationEngine, TICKS_PER_SECOND
+from simulation.early_stopping import EarlyStopPolicy
+from map_scripts.gate_geometry import GateGeometry
+from map_scripts.map_layer import MapLayer
+from pygame_extensions.dirty_rects import DirtyRectTracker
+from pygame_extensions.text_cache import TEXT_CACHE
+from simulation.replay import ReplayRecorder
 
 pg.init()
 
@@ -21,29 +32,48 @@ USE_BG_IMG: bool = False
 BG_IMG: Surface = pg.image.load(os.path.join("imgs", "bg_img.png"))
 BG_COLOR = pg.Color(32, 32, 32)
 
-RAY_DISTANCE_KILL: float = 10
-
 DEBUG_KEY = pg.K_r
+FAST_FORWARD_KEY = pg.K_f
+PROFILER_KEY = pg.K_p
+
+# in fast forward the simulation steps for this long before every rendered frame
+FAST_FORWARD_FRAME_SECONDS: float = 1 / 30
+
+MAP_LAYER_CACHE_SIZE: int = 4
+# (walls, gates, gate labels, layer) of the last drawn maps, so the generations on a map share its layers
+map_layers: List[tuple[list, list, bool, MapLayer]] = []
+
+def get_map_layer(walls, gates, gate_labels: bool, font: Font) -> MapLayer:
+    for cached_walls, cached_gates, cached_gate_labels, layer in map_layers:
+        if cached_walls is walls and cached_gates is gates and cached_gate_labels == gate_labels:
+            return layer
+
+    layer = MapLayer((WIDTH, HEIGHT), walls, gates, BG_IMG if USE_BG_IMG else None, BG_COLOR, font if gate_labels else None)
+    map_layers.insert(0, (walls, gates, gate_labels, layer))
+    del map_layers[MAP_LAYER_CACHE_SIZE:]
+    return layer
 
 class BreakTrainingException(Exception):
     pass
 
-class Simulation:
-    def __init__(self, cars: List[Car], walls, gates, generation_number: int, config=None, infinite_time: bool=False) -> None:        
-        self.cars: List[Car] = cars
-        self.walls = walls
-        self.gates = gates
-        self.config = config
-        self.infinite_time: bool = infinite_time
+class Simulation(SimulationEngine):
+    def __init__(self, cars: List[Car], walls, gates, generation_number: int, config=None, infinite_time: bool=False, steps_per_frame: int = 1, fast_forward: bool = False, debug_ray_cars: int = 0, ray_sensors: RaySensorEngine | None = None, early_stop: EarlyStopPolicy | None = None, replay_recorder: ReplayRecorder | None = None) -> None:        
+        super().__init__(cars, walls, gates, generation_number, config, infinite_time, ray_sensors, early_stop, replay_recorder)
+        self.steps_per_frame: int = max(1, steps_per_frame)
+        self.fast_forward: bool = fast_forward
+        # with debug drawing only the rays of this many best cars (and the selected one) are drawn, 0 draws all of them
+        self.debug_ray_cars: int = max(0, debug_ray_cars)
+        self.selected_car_index: int = -1
+        self.show_profiler: bool = False
         self.win: pg.surface.Surface = pg.display.set_mode((WIDTH, HEIGHT))
-        self.max_score: float = 0
         self.clock = pg.time.Clock()
-        self.frames: int = 0
-        self.generation_number: int = generation_number
         self.simulation_ui: PySimulationUi | PyNeatSimulationUi | PyTestUi
         self.create_appropriate_ui()
         self.font: Font = pg.font.SysFont("arial", 25)
-        self.statistics: SimulationStatistics = SimulationStatistics()
+        # only the parts of the window that changed are pushed to the display
+        self.dirty_rects = DirtyRectTracker((WIDTH, HEIGHT))
+        self.debug: bool = False
+        self.ray_overlay = RayDebugOverlay((WIDTH, HEIGHT))
                 
     def create_appropriate_ui(self) -> None:
         if not self.is_neat_simulation:
@@ -51,57 +81,81 @@ class Simulation:
             self.simulation_ui.create_map_selection_ui(0, HEIGHT, get_map_names(), self.change_map)
         else:
             self.simulation_ui = PyNeatSimulationUi(self.win, self.end_training, self.end_simulation)
+            self.simulation_ui.create_fast_forward_button(self.toggle_fast_forward, self.fast_forward)
                     
     def plot_values(self, values_to_plot: list[SimulationStatistics]) -> None:
         self.simulation_ui.plot_values(WIDTH, HEIGHT, values_to_plot)
         
     def change_map(self, map_name: str) -> None:
-        self.walls, self.gates, self.starting_point = read_map_txt(map_name)
+        loaded_map: LoadedMap = get_map(map_name)
+        self.walls, self.gates, self.starting_point = loaded_map.walls, loaded_map.gates, loaded_map.starting_point
+        self.ray_sensors = loaded_map.ray_sensors
+        self.gate_geometry = GateGeometry(self.gates)
         for car in self.cars:
             car.position = self.starting_point
-            
-    @property
-    def is_neat_simulation(self) -> bool:
-        return self.config is not None
+        self.dirty_rects.invalidate()
         
-    def draw_background(self, bg_img: Surface) -> None:
-        if USE_BG_IMG:
-            self.win.blit(bg_img, (0, 0))
-        else:
-            self.win.fill(BG_COLOR)
+    def map_layer(self, debug: bool = False) -> MapLayer:
+        '''
+        Background, gates and walls of the current map, only drawn again when the map changes.
+        '''
+        return get_map_layer(self.walls, self.gates, debug, self.font)
+
+    def draw_background(self, debug: bool = False) -> None:
+        if debug != self.debug:
+            # gate labels are part of the debug background
+            self.debug = debug
+            self.dirty_rects.invalidate()
+        self.map_layer(debug).draw_background(self.win)
         
     def refresh(self) -> None:      
-        pg.display.update()
-        
-    def end_simulation(self) -> None:
-        for car in self.cars:
-            self.statistics.add_score(car.get_score())
-        self.cars.clear()
+        self.dirty_rects.update()
         
     def end_training(self):
         raise BreakTrainingException("Training ended.")
         
+    def toggle_fast_forward(self) -> None:
+        self.fast_forward = not self.fast_forward
+        self.simulation_ui.set_fast_forward(self.fast_forward)
+        
     def draw_simulation(self, debug=False) -> None:        
         text: pg.surface.Surface
-       
-        for gate in self.gates:
-            gate.draw(self.win)
-            if debug:
-                text = self.font.render(str(gate.num), True, (255, 255, 255))
-                self.win.blit(text, gate.get_centre_position())
 
-        for car in self.cars:
-            if debug:
-                for line in car.rays:
-                    line.draw_debug(self.win)
-            car.draw(self.win)        
-            if debug:
-                text = self.font.render(str(int(car.get_score())), True, (255, 255, 255))
-                self.win.blit(text, car.get_centre_position())
-
-        for wall in self.walls:
-            wall.draw(self.win)
+        if debug:
+            self.profiler.mark("drawing")
+            self.dirty_rects.add(self.ray_overlay.draw(self.win, self.population, self.debug_ray_indices()))
+            self.profiler.mark("debug rays")
+
+        self.draw_cars()
+        if debug:
+            for car in self.cars:
+                text = TEXT_CACHE.render(self.font, str(int(self.population.fitness[car.population_index])), True, (255, 255, 255))
+                self.dirty_rects.add(self.win.blit(text, car.get_centre_position()))
+
+        self.map_layer(debug).draw_walls(self.win)
+        self.profiler.mark("drawing")
+        
+    def debug_ray_indices(self) -> np.ndarray:
+        '''
+        Population indices of the living cars whose rays are drawn with debug drawing.
+        '''
+        alive: np.ndarray = self.population.alive_indices()
+        if self.debug_ray_cars == 0 or len(alive) <= self.debug_ray_cars:
+            return alive
+
+        best: np.ndarray = alive[np.argpartition(-self.population.fitness[alive], self.debug_ray_cars - 1)[:self.debug_ray_cars]]
+        if self.selected_car_index >= 0 and self.population.alive[self.selected_car_index] and self.selected_car_index not in best:
+            best = np.append(best, self.selected_car_index)
+        return best
         
+    def draw_cars(self) -> None:
+        alive = self.population.alive_indices()
+        rects: List[pg.Rect] = CAR_SPRITES.draw(self.win, self.population.positions[alive], self.population.angles[alive])
+        # rects are used to select cars with the mouse
+        for car, rect in zip(self.cars, rects):
+            car.rect = rect
+        self.dirty_rects.add_all(rects)
+
     def check_if_quit(self, event) -> bool:
         keys: Sequence[bool] = pg.key.get_pressed()
 
@@ -134,69 +188,68 @@ class Simulation:
             if self.check_if_quit(event):
                 pg.quit()
                 quit()
+            if event.type == pg.KEYDOWN and event.key == FAST_FORWARD_KEY and self.is_neat_simulation:
+                self.toggle_fast_forward()
+            if event.type == pg.KEYDOWN and event.key == PROFILER_KEY:
+                self.show_profiler = not self.show_profiler
+            if event.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED):
+                self.dirty_rects.invalidate()
             self.simulation_ui.handle_event(event)
 
     def handle_car_selection(self, cars: List[Car], mouse_pos: Vector2, config, win) -> None:
         selected: Car | None = self.selected_car(cars, mouse_pos)
+        if selected is not None:
+            self.selected_car_index = selected.population_index
         if selected and isinstance(self.simulation_ui, PyNeatSimulationUi) and isinstance(selected, AICar):
             visualize.draw_net(config, selected._genome, view=False, filename="neural_net", fmt="png")  
             self.simulation_ui.create_neat_diagram(0, HEIGHT, "neural_net.png")        
+
+    def run_frame_steps(self) -> int:
+        '''
+        Runs the simulation ticks that happen between two rendered frames.
+        In fast forward that is as many ticks as fit in FAST_FORWARD_FRAME_SECONDS, otherwise steps_per_frame.
+        '''
+        steps: int = 0
+        deadline: float = time.perf_counter() + FAST_FORWARD_FRAME_SECONDS
+        while self.is_running():
+            self.simulation_step()
+            steps += 1
+            if self.fast_forward:
+                if time.perf_counter() >= deadline:
+                    break
+            elif steps >= self.steps_per_frame:
+                break
+        return steps
             
-    def calculate_scores(self) -> tuple[float, float]:
-        try:
-            self.max_score = max([self.max_score] + [car.get_score() for car in self.cars])
-            average_score = sum([car.get_score() for car in self.cars]) / len(self.cars)  
-            return self.max_score, average_score
-        except ZeroDivisionError:
-            return self.max_score, 0
-        
     def simulation_loop(self) -> None:               
         win: pg.surface.Surface = pg.display.set_mode((WIDTH, HEIGHT), pg.SRCALPHA)
         clock = pg.time.Clock()
 
-        frames = 0
-        while len(self.cars) > 0 and (frames < 60 * (10 + self.generation_number) or self.infinite_time):
-            clock.tick(60)        
+        while self.is_running():
+            self.profiler.start_frame()
+            if self.fast_forward:
+                clock.tick()
+            else:
+                clock.tick(TICKS_PER_SECOND)        
+            self.profiler.mark("idle")
             
-            self.draw_background(BG_IMG)
-                
-            i = 0
-            while i < len(self.cars):
-                car: Car = self.cars[i]
-                
-                car.calculate_line_distances_quick(self.walls)
-                outputs: Vector2 = car.get_desired_movement()
-
-                car.move_forward(outputs[0])
-                car.steer(outputs[1])    
-
-                car.reward(car._speed / 60)
+            debug: bool = pg.key.get_pressed()[DEBUG_KEY]
+            self.draw_background(debug)
+            self.profiler.mark("drawing")
                 
-                if car.get_shortest_last_distance() < RAY_DISTANCE_KILL:
-                    car.reward(-50)
-
-                    self.statistics.add_score(car.get_score())
-                    self.cars.pop(i)
-                else:
-                    i += 1                
-                    
-            for car in self.cars:     
-                results: List[tuple[int, int, int]] = car.calculate_on_which_side_of_next_gates(self.gates)  
-                car.move()                   
-                if car.check_if_in_on_other_side_of_gate(self.gates, results):
-                    car.reward(100)
-
-            frames += 1
+            self.run_frame_steps()
             
-            debug: bool = pg.key.get_pressed()[DEBUG_KEY]
             self.draw_simulation(debug)
-            self.simulation_ui.draw()
-            self.simulation_ui.draw_simulation_info(*self.calculate_scores(), self.generation_number, WIDTH - 10)
+            self.dirty_rects.add_all(self.simulation_ui.draw())
+            self.dirty_rects.add_all(self.simulation_ui.draw_simulation_info(*self.calculate_scores(), self.generation_number, WIDTH - 10))
+            if self.show_profiler:
+                self.dirty_rects.add_all(self.simulation_ui.draw_profiler_info(self.profiler.rolling_breakdown(), WIDTH - 10))
+            self.profiler.mark("ui")
         
             self.process_input(self.cars, self.config, win)
+            self.profiler.mark("input")
             
             self.refresh()
-        self.end_simulation()
-            
-    def get_statistics(self) -> SimulationStatistics:
-        return self.statistics
+            self.profiler.mark("display")
+            self.profiler.end_frame()
+        self.end_simulation()
\ No newline at end of file
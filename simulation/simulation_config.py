@@ -7,4 +7,20 @@ class SimulationConfig:
     hidden_layers: int
     random_angle: bool
     ray_count: int | None = None
-    initial_population: int | None = None    
\ No newline at end of file
+    initial_population: int | None = None
+    workers: int = 1
+    steps_per_frame: int = 1
+    debug_ray_cars: int = 0
+    profile_log: str | None = None
+    maps_per_generation: int = 1
+    fitness_reducer: str = "mean"
+    map_weights: list[float] | None = None
+    stall_ticks: int | None = None
+    stop_hopeless_generations: bool = False
+    max_frames: int | None = None
+    checkpoint_keep_last: int | None = None
+    checkpoint_keep_every: int | None = None
+    checkpoint_keep_best: bool = True
+    checkpoint_compression: str = "gzip"
+    seed: int | None = None
+    record_replays: bool = False
@@ -0,0 +1,158 @@
+import numpy as np
+from typing import List
+from cars.car import Car
+from cars.car_population import CarPopulation
+from cars.ray_sensors import RaySensorEngine
+from simulation.statistics import SimulationStatistics
+from simulation.frame_profiler import FrameProfiler
+from simulation.early_stopping import EarlyStopPolicy, minimum_gate_gap
+from map_scripts.gate_geometry import GateGeometry
+from simulation.replay import ReplayRecorder
+
+RAY_DISTANCE_KILL: float = 10
+
+TICKS_PER_SECOND: int = 60
+BASE_SIMULATION_SECONDS: int = 10
+
+WALL_HIT_PENALTY: float = -50
+GATE_REWARD: float = 100
+
+class SimulationEngine:
+    def __init__(self, cars: List[Car], walls, gates, generation_number: int, config=None, infinite_time: bool=False, ray_sensors: RaySensorEngine | None = None, early_stop: EarlyStopPolicy | None = None, replay_recorder: ReplayRecorder | None = None) -> None:
+        self.cars: List[Car] = cars
+        self.walls = walls
+        self.gates = gates
+        self.config = config
+        self.infinite_time: bool = infinite_time
+        self.max_score: float = 0
+        self.frames: int = 0
+        self.generation_number: int = generation_number
+        self.statistics: SimulationStatistics = SimulationStatistics()
+        self.population: CarPopulation = CarPopulation(cars)
+        # maps from the map registry come with ray sensors that are already set up for their walls
+        self.ray_sensors: RaySensorEngine = ray_sensors if ray_sensors is not None else RaySensorEngine(walls)
+        self.profiler: FrameProfiler = FrameProfiler()
+        self.gate_geometry: GateGeometry = GateGeometry(gates)
+
+        self.early_stop: EarlyStopPolicy = early_stop if early_stop is not None else EarlyStopPolicy()
+        self.stopped_early: bool = False
+        self.best_finished_score: float = -np.inf
+        self.last_progress_frames: np.ndarray = np.zeros(self.population.size, dtype=np.int64)
+        self.gate_gap: float = minimum_gate_gap(gates) if self.early_stop.stop_hopeless else np.inf
+
+        self.replay_recorder: ReplayRecorder | None = replay_recorder
+        if self.replay_recorder is not None:
+            self.replay_recorder.record(self.population)
+
+    @property
+    def is_neat_simulation(self) -> bool:
+        return self.config is not None
+
+    @property
+    def max_frames(self) -> int:
+        max_frames: int = TICKS_PER_SECOND * (BASE_SIMULATION_SECONDS + self.generation_number)
+        if self.early_stop.max_frames is not None:
+            return min(max_frames, self.early_stop.max_frames)
+        return max_frames
+
+    def is_running(self) -> bool:
+        return len(self.cars) > 0 and not self.stopped_early and (self.frames < self.max_frames or self.infinite_time)
+
+    def end_simulation(self) -> None:
+        if self.replay_recorder is not None:
+            self.replay_recorder.close()
+        alive: np.ndarray = self.population.alive_indices()
+        for score in self.population.fitness[alive].tolist():
+            self.statistics.add_score(score)
+        # the survivors are counted once, ending again (skip generation, then the loop end) adds nothing
+        self.population.kill(alive)
+        self.population.release()
+        self.cars.clear()
+
+    def calculate_scores(self) -> tuple[float, float]:
+        alive_scores: np.ndarray = self.population.fitness[self.population.alive]
+        if len(alive_scores) == 0:
+            return self.max_score, 0
+        self.max_score = max(self.max_score, float(alive_scores.max()))
+        return self.max_score, float(alive_scores.mean())
+
+    def simulation_step(self) -> None:
+        population: CarPopulation = self.population
+        alive: np.ndarray = population.alive_indices()
+
+        self.ray_sensors.sense(population, alive)
+        self.profiler.mark("sensing")
+
+        outputs: np.ndarray = population.desired_movements(alive)
+        self.profiler.mark("networks")
+        population.accelerate(alive, outputs[:, 0])
+        population.steer(alive, outputs[:, 1])
+
+        population.reward(alive, population.speeds[alive] / TICKS_PER_SECOND)
+
+        crashed: np.ndarray = alive[population.shortest_ray_distances(alive) < RAY_DISTANCE_KILL]
+        if len(crashed) > 0:
+            population.reward(crashed, WALL_HIT_PENALTY)
+            self.finish_cars(crashed)
+            alive = population.alive_indices()
+
+        self.profiler.mark("physics")
+
+        if self.gate_geometry.gate_count == 0:
+            population.move(alive)
+            self.profiler.mark("physics")
+        else:
+            candidates, candidate_directions = self.gate_geometry.next_gates(population.last_gates[alive], population.directions[alive])
+            previous_sides: np.ndarray = self.gate_geometry.sides_of_next_gates(candidates, population.positions[alive])
+            self.profiler.mark("gates")
+            population.move(alive)
+            self.profiler.mark("physics")
+            self.pass_gates(alive, candidates, candidate_directions, previous_sides)
+            self.profiler.mark("gates")
+
+        self.frames += 1
+
+        if self.early_stop.is_active:
+            self.apply_early_stop()
+            self.profiler.mark("early stop")
+
+        if self.replay_recorder is not None:
+            self.replay_recorder.record(self.population)
+            self.profiler.mark("replay")
+
+    def pass_gates(self, alive: np.ndarray, candidates: np.ndarray, candidate_directions: np.ndarray, previous_sides: np.ndarray) -> None:
+        population: CarPopulation = self.population
+        passed, gates, directions = self.gate_geometry.crossed_gates(candidates, candidate_directions, previous_sides, population.positions[alive])
+        if not passed.any():
+            return
+
+        passing: np.ndarray = alive[passed]
+        population.last_gates[passing] = gates[passed]
+        population.directions[passing] = directions[passed]
+        population.reward(passing, GATE_REWARD)
+        self.last_progress_frames[passing] = self.frames
+
+    def finish_cars(self, indices: np.ndarray) -> None:
+        scores: np.ndarray = self.population.fitness[indices]
+        for score in scores.tolist():
+            self.statistics.add_score(score)
+        self.best_finished_score = max(self.best_finished_score, float(scores.max()))
+        self.population.kill(indices)
+        self.cars = self.population.alive_cars()
+
+    def apply_early_stop(self) -> None:
+        alive: np.ndarray = self.population.alive_indices()
+
+        if self.early_stop.stall_ticks is not None and len(alive) > 0:
+            stalled: np.ndarray = alive[self.frames - self.last_progress_frames[alive] >= self.early_stop.stall_ticks]
+            if len(stalled) > 0:
+                self.finish_cars(stalled)
+                alive = self.population.alive_indices()
+
+        if self.early_stop.stop_hopeless and len(alive) > 0 and not self.infinite_time:
+            reachable_gain: float = EarlyStopPolicy.max_score_gain(self.max_frames - self.frames, self.gate_gap, TICKS_PER_SECOND, GATE_REWARD)
+            if float(self.population.fitness[alive].max()) + reachable_gain < self.best_finished_score:
+                self.stopped_early = True
+
+    def get_statistics(self) -> SimulationStatistics:
+        return self.statistics
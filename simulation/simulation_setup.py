@@ -1,57 +1,54 @@
 import neat # type: ignore
 from neat.nn.feed_forward import FeedForwardNetwork # type: ignore
 from pygame.math import Vector2
-from math import degrees
 import random
 from typing import List, Optional
 from simulation.processing_functions import Linear, Quadratic
-from map_scripts.map_reader import read_map_txt
-from math import atan2, degrees, pi
+from map_scripts.map_registry import LoadedMap, get_map
+from simulation.seeding import random_stream, START_ANGLE_STREAM
 
 from cars.car import Car, AICar, HumanCar
-from map_scripts.map import Wall, Gate
+from map_scripts.map import angle_between, find_angle_to_first_gate
 
 RAY_LENGTH: float = 200
 NON_RAY_INPUTS: int = 1
 
-def angle_between(p1: Vector2, p2: Vector2) -> float:
-    return degrees(atan2(-(p2.y - p1.y), p2.x - p1.x) % (2 * pi)) + 180
-
-def find_angle_to_first_gate(position: Vector2, gates: List[Gate]) -> float:
-    if gates:
-        return angle_between(position, gates[0].get_centre_position())
-    else:
-        raise ValueError("No gates found in the map")
-    
-def setup_generation(map_name: str, genomes: List[neat.DefaultGenome], config, ray_count, random_angle: bool=True, processing_function=Quadratic) -> tuple[list[Car], list, list]:
+def setup_generation(map_name: str, genomes: List[neat.DefaultGenome], config, ray_count, random_angle: bool=True, processing_function=Quadratic, angle_seed: Optional[int]=None) -> tuple[list[Car], list, list]:
     cars: List[Car] = []
     
-    walls: List[Wall]
-    gates: List[Gate]
-    starting_point: Vector2
+    loaded_map: LoadedMap = get_map(map_name)
     
-    walls, gates, starting_point = read_map_txt(map_name)
-    
-    intended_angle: float | None = find_angle_to_first_gate(starting_point, gates) if not random_angle else None
+    intended_angle: float | None = loaded_map.intended_angle() if not random_angle else None
      
-    cars = spawn_ai_cars(genomes, config, starting_point, intended_angle) 
+    cars = spawn_ai_cars(genomes, config, loaded_map.starting_point, intended_angle, angle_seed) 
     generate_rays(cars, ray_count, processing_function)
             
-    return cars, walls, gates
+    return cars, loaded_map.walls, loaded_map.gates
 
 def generate_rays(cars: list[Car], ray_count, processing_function) -> None:
     for car in cars:        
         car.generate_rays(ray_count, RAY_LENGTH, processing_function)
 
-def spawn_ai_cars(genomes: List[neat.DefaultGenome], config: neat.Config, starting_point: Vector2, default_angle=None) -> List[Car]:
+def start_angle(default_angle, angle_seed: Optional[int], key: int) -> float:
+    '''
+    With an angle seed the angle of each car only depends on the seed and its key (genome id or car index),
+    not on the order the cars are spawned in or on the process that spawns them.
+    '''
+    if default_angle is not None:
+        return default_angle
+    if angle_seed is None:
+        return random.randrange(-180, 180)
+    return random_stream(angle_seed, START_ANGLE_STREAM, key).randrange(-180, 180)
+
+def spawn_ai_cars(genomes: List[neat.DefaultGenome], config: neat.Config, starting_point: Vector2, default_angle=None, angle_seed: Optional[int]=None) -> List[Car]:
     cars: List[Car] = []
     
-    for _, genome in genomes:
+    for genome_id, genome in genomes:
         genome.fitness = 0
         new_car = AICar(
             starting_point.x, 
             starting_point.y, 
-            random.randrange(-180, 180) if default_angle is None else default_angle)
+            start_angle(default_angle, angle_seed, genome_id))
                 
         neural_net: FeedForwardNetwork = FeedForwardNetwork.create(genome, config)
         
@@ -62,14 +59,14 @@ def spawn_ai_cars(genomes: List[neat.DefaultGenome], config: neat.Config, starti
         
     return cars
 
-def spawn_player_cars(starting_point: Vector2, default_angle=None, count: int=1) -> List[Car]:
+def spawn_player_cars(starting_point: Vector2, default_angle=None, count: int=1, angle_seed: Optional[int]=None) -> List[Car]:
     cars: List[Car] = []
     
-    for _ in range(count):
+    for index in range(count):
         human_car: HumanCar = HumanCar(
             starting_point.x, 
             starting_point.y, 
-            random.randrange(-180, 180) if default_angle is None else default_angle)
+            start_angle(default_angle, angle_seed, index))
         
         cars.append(human_car)
         
@@ -1,5 +1,7 @@
+import time
 import pygame as pg
 from pygame.font import Font
+from pygame_extensions.text_cache import TEXT_CACHE
 from pygame_extensions.pyui_elements import PyButton, PyUiElement, PyInputBox, PyImage, PyPlot, PyScrollView
 from pygame.surface import Surface
 from simulation.statistics import SimulationStatistics
@@ -13,6 +15,9 @@ DEFAULT_FONT = pg.font.Font(None, 32)
 DEFAULT_BUTTON_HEIGHT = 64
 DEFAULT_SPACE_BETWEEN_BUTTONS = 20
 
+# numbers in the info text change at most this often, so they are readable and are not rendered again every frame
+TEXT_REFRESH_SECONDS: float = 0.25
+
 class PyDefaultUi:
     def __init__(self, win: Surface, go_back_action) -> None:
         self.back_button: PyButton = self.create_button(10, 10, 200, DEFAULT_BUTTON_HEIGHT, "Main Menu")
@@ -22,17 +27,36 @@ class PyDefaultUi:
         
         self.win: Surface = win
         self.font: Font = DEFAULT_FONT
+        self.text_refresh_seconds: float = TEXT_REFRESH_SECONDS
+        self.shown_texts: dict[str, tuple[str, float]] = {}
         
     def set_font(self, font: Font) -> None:
         self.font = font
         
+    def refreshed_text(self, line: str, text: str) -> str:
+        '''
+        The text to show on the given line, which keeps the previous text until text_refresh_seconds have passed.
+        '''
+        now: float = time.perf_counter()
+        shown: tuple[str, float] | None = self.shown_texts.get(line)
+        if shown is not None and shown[0] != text and now - shown[1] < self.text_refresh_seconds:
+            return shown[0]
+        if shown is None or shown[0] != text:
+            self.shown_texts[line] = (text, now)
+        return text
+
+    def render_text(self, line: str, text: str, color=(255, 255, 255)) -> Surface:
+        return TEXT_CACHE.render(self.font, self.refreshed_text(line, text), True, color)
+        
     def handle_event(self, event) -> None:
         for element in self.ui_elements:
             element.handle_event(event)
 
-    def draw(self) -> None:
-        for element in self.ui_elements:
-            element.draw(self.win)
+    def draw(self) -> list[pg.Rect]:
+        '''
+        Returns the areas that were drawn on.
+        '''
+        return [element.draw(self.win) for element in self.ui_elements]
         
     def create_button(self, x: float, y: float, width: float, height: float, text: str) -> PyButton:
         button = PyButton(text, x, y, width, height, DEFAULT_BUTTON_COLOR, DEFAULT_HOVER_COLOR, DEFAULT_FONT_COLOR, DEFAULT_FONT)
@@ -59,18 +83,41 @@ class PySimulationUi(PyDefaultUi):
         self.skip_generation_button.action = skip_generation_action
                 
         self.plot: Surface | None = None
+        self.fast_forward_button: PyButton | None = None
         
         self.ui_elements.append(self.skip_generation_button)
         
-    def draw_simulation_info(self, score, average_score, generation_number, right_x_position: float) -> None:
-        score_text: Surface = self.font.render("Highest Score - {:.2f}".format(score), True, (255, 255, 255))
-        self.win.blit(score_text, (right_x_position - score_text.get_width(), 10))
+    def create_fast_forward_button(self, toggle_fast_forward_action, fast_forward: bool = False) -> None:
+        self.fast_forward_button = self.create_button(self.skip_generation_button.rect.bottomright[0] + DEFAULT_SPACE_BETWEEN_BUTTONS, 10, 200, DEFAULT_BUTTON_HEIGHT, "")
+        self.fast_forward_button.connect(toggle_fast_forward_action)
+        self.set_fast_forward(fast_forward)
+        self.ui_elements.append(self.fast_forward_button)
+        
+    def set_fast_forward(self, fast_forward: bool) -> None:
+        if self.fast_forward_button is not None:
+            self.fast_forward_button.text = "Real Time" if fast_forward else "Fast Forward"
+        
+    def draw_simulation_info(self, score, average_score, generation_number, right_x_position: float) -> list[pg.Rect]:
+        rects: list[pg.Rect] = []
+        score_text: Surface = self.render_text("highest score", "Highest Score - {:.2f}".format(score))
+        rects.append(self.win.blit(score_text, (right_x_position - score_text.get_width(), 10)))
         
-        score_text: Surface = self.font.render("Average Score - {:.2f}".format(average_score), True, (255, 255, 255))
-        self.win.blit(score_text, (right_x_position - score_text.get_width(), 50))
+        score_text: Surface = self.render_text("average score", "Average Score - {:.2f}".format(average_score))
+        rects.append(self.win.blit(score_text, (right_x_position - score_text.get_width(), 50)))
 
-        gen_text: Surface = self.font.render(f"Generation {generation_number}", True, (255, 255, 255))
-        self.win.blit(gen_text, (right_x_position - gen_text.get_width(), 90))
+        gen_text: Surface = self.render_text("generation", f"Generation {generation_number}")
+        rects.append(self.win.blit(gen_text, (right_x_position - gen_text.get_width(), 90)))
+        return rects
+        
+    def draw_profiler_info(self, breakdown: list[tuple[str, float]], right_x_position: float, top_y_position: float = 140) -> list[pg.Rect]:
+        rects: list[pg.Rect] = []
+        total_text: Surface = self.render_text("profiler frame", "Frame - {:.2f} ms".format(sum(milliseconds for _, milliseconds in breakdown)))
+        rects.append(self.win.blit(total_text, (right_x_position - total_text.get_width(), top_y_position)))
+        
+        for line, (phase, milliseconds) in enumerate(breakdown, start=1):
+            phase_text: Surface = self.render_text(f"profiler {phase}", "{} - {:.2f} ms".format(phase, milliseconds), (200, 200, 200))
+            rects.append(self.win.blit(phase_text, (right_x_position - phase_text.get_width(), top_y_position + line * 30)))
+        return rects
                 
     def plot_values(self, right_x: float, bottom_y: float, values_to_plot: list[SimulationStatistics], show_plot: bool = False) -> None:
         self.plot: Surface = PyPlot(
@@ -167,8 +214,33 @@ class PyTestUi(PySimulationUi):
             self.map_selection.add_element(button, DEFAULT_BUTTON_HEIGHT + self.MAP_SELECTION_SPACING)
             button_top_y += DEFAULT_BUTTON_HEIGHT + self.MAP_SELECTION_SPACING    
         
-    def draw(self) -> None:
-        super().draw()
+    def draw(self) -> list[pg.Rect]:
+        return super().draw()
+
+class PyReplayUi(PyDefaultUi):
+    def __init__(self, win: Surface, go_back_action, toggle_pause_action) -> None:
+        super().__init__(win, go_back_action)
+        self.pause_button: PyButton = self.create_button(self.back_button.rect.bottomright[0] + DEFAULT_SPACE_BETWEEN_BUTTONS, 10, 200, DEFAULT_BUTTON_HEIGHT, "")
+        self.pause_button.connect(toggle_pause_action)
+        self.set_paused(False)
+        self.ui_elements.append(self.pause_button)
+
+    def set_paused(self, paused: bool) -> None:
+        self.pause_button.text = "Play" if paused else "Pause"
+
+    def draw_replay_info(self, tick: int, tick_count: int, speed: float, alive: int, best_score: float, generation_number: int, right_x_position: float) -> list[pg.Rect]:
+        lines: list[str] = [
+            "Highest Score - {:.2f}".format(best_score),
+            f"Alive - {alive}",
+            f"Generation {generation_number}",
+            f"Tick {tick} / {tick_count}",
+            "Speed - {:g}x".format(speed),
+        ]
+        rects: list[pg.Rect] = []
+        for line, text in enumerate(lines):
+            text_surface: Surface = self.render_text(str(line), text)
+            rects.append(self.win.blit(text_surface, (right_x_position - text_surface.get_width(), 10 + line * 40)))
+        return rects
 
 class PyMapMakerUi(PyDefaultUi):
     def __init__(self, win: Surface, go_back_action, save_map_action, map_width: float, map_height: float) -> None:
@@ -186,8 +258,8 @@ class PyMapMakerUi(PyDefaultUi):
         self.save_map_button.connect(save_map_action)        
         self.ui_elements.append(self.save_map_button)
         
-    def draw(self) -> None:
-        super().draw()
+    def draw(self) -> list[pg.Rect]:
+        return super().draw()
         
     @property    
     def map_name(self) -> str:
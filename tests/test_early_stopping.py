@@ -0,0 +1,11 @@
+import math
+from map_scripts.map import Gate
+from simulation.early_stopping import minimum_gate_gap, GATE_PASS_MARGIN
+
+def test_gate_gap_leaves_room_for_the_gate_tolerance() -> None:
+    gates = [Gate(0, 0, 0, 0, 100), Gate(1, 50, 0, 50, 100)]
+    assert math.isclose(minimum_gate_gap(gates), 50 - 2 * GATE_PASS_MARGIN)
+
+def test_gate_gap_is_never_negative() -> None:
+    gates = [Gate(0, 0, 0, 0, 100), Gate(1, 5, 0, 5, 100)]
+    assert minimum_gate_gap(gates) == 0
@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+from simulation.fitness_reduction import reduce_fitness, check_map_weights
+
+def test_weighted_rejects_negative_weights() -> None:
+    with pytest.raises(ValueError):
+        reduce_fitness(np.ones((2, 3)), "weighted", [2, -1])
+
+def test_map_weights_are_checked_against_the_pool() -> None:
+    check_map_weights([1, 2], ["a.txt", "b.txt"])
+    check_map_weights(None, ["a.txt"])
+    with pytest.raises(ValueError):
+        check_map_weights([1], ["a.txt", "b.txt"])
+    with pytest.raises(ValueError):
+        check_map_weights([2, -1], ["a.txt", "b.txt"])
@@ -0,0 +1,27 @@
+import random
+import neat # type: ignore
+from simulation.headless_simulation import HeadlessSimulation
+from simulation.simulation_setup import setup_generation
+
+NEAT_CONFIG_PATH = "config"
+CAR_COUNT = 10
+
+def create_simulation() -> HeadlessSimulation:
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation, NEAT_CONFIG_PATH)
+    config.pop_size = CAR_COUNT
+    random.seed(0)
+    genomes = list(neat.Population(config).population.items())
+    cars, walls, gates = setup_generation(map_name="easy_map.txt", genomes=genomes, config=config, ray_count=8, random_angle=False)
+    return HeadlessSimulation(cars, walls, gates, 1, config)
+
+def test_ending_twice_counts_every_car_once() -> None:
+    simulation = create_simulation()
+    for _ in range(3):
+        simulation.simulation_step()
+
+    # the skip generation button ends the simulation, then the simulation loop ends it again
+    simulation.end_simulation()
+    simulation.end_simulation()
+
+    assert len(simulation.get_statistics().scores) == CAR_COUNT
+    assert not simulation.population.alive.any()
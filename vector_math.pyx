@@ -1,3 +1,5 @@
+cimport cython
+from libc.math cimport sqrt, NAN
 from pygame.math import Vector2
 import math
 from typing import List
@@ -68,4 +70,115 @@ def position_from_length_and_angle(float angle, float length):
     cdef float delta_y = length * math.cos(math.radians(angle))
     cdef float delta_x = length * math.sin(math.radians(angle))
 
-    return Vector2(delta_x, delta_y)
\ No newline at end of file
+    return Vector2(delta_x, delta_y)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef inline double _ray_wall_intersection(double ax, double ay, double bx, double by, double cx, double cy, double dx, double dy) noexcept nogil:
+    # fraction of the ray AB at which it crosses the wall CD, or -1 when they do not intersect
+    cdef double s10_x = bx - ax
+    cdef double s10_y = by - ay
+    cdef double s32_x = dx - cx
+    cdef double s32_y = dy - cy
+
+    cdef double denom = s10_x * s32_y - s32_x * s10_y
+
+    if denom == 0:
+        return -1
+
+    cdef double s02_x = ax - cx
+    cdef double s02_y = ay - cy
+
+    cdef double s = (s10_x * s02_y - s10_y * s02_x) / denom
+    cdef double t = (s32_x * s02_y - s32_y * s02_x) / denom
+
+    if s < 0 or s > 1 or t < 0 or t > 1:
+        return -1
+
+    return t
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline void _store_closest_hit(Py_ssize_t i, double closest_t, const double[:, ::1] origins, const double[:, ::1] ends, double[::1] out_distances, double[:, ::1] out_points, unsigned char[::1] out_hits) noexcept nogil:
+    cdef double ray_x = ends[i, 0] - origins[i, 0]
+    cdef double ray_y = ends[i, 1] - origins[i, 1]
+    cdef double length = sqrt(ray_x * ray_x + ray_y * ray_y)
+
+    if closest_t <= 1:
+        out_distances[i] = closest_t * length
+        out_points[i, 0] = origins[i, 0] + closest_t * ray_x
+        out_points[i, 1] = origins[i, 1] + closest_t * ray_y
+        out_hits[i] = 1
+    else:
+        out_distances[i] = length
+        out_points[i, 0] = NAN
+        out_points[i, 1] = NAN
+        out_hits[i] = 0
+
+def _check_batch_shapes(origins, ends, wall_starts, wall_ends, out_distances, out_points, out_hits) -> None:
+    if ends.shape[0] != origins.shape[0] or out_distances.shape[0] != origins.shape[0] or out_points.shape[0] != origins.shape[0] or out_hits.shape[0] != origins.shape[0]:
+        raise ValueError("Ray inputs and outputs must have the same length")
+    if wall_ends.shape[0] != wall_starts.shape[0]:
+        raise ValueError("Wall starts and ends must have the same length")
+    if origins.shape[1] != 2 or ends.shape[1] != 2 or wall_starts.shape[1] != 2 or wall_ends.shape[1] != 2 or out_points.shape[1] != 2:
+        raise ValueError("Positions must have two coordinates")
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def cast_rays_batch(const double[:, ::1] origins, const double[:, ::1] ends, const double[:, ::1] wall_starts, const double[:, ::1] wall_ends, double[::1] out_distances, double[:, ::1] out_points, unsigned char[::1] out_hits):
+    '''
+    Finds the closest wall hit of every ray (origins[i] -> ends[i]) against every wall,
+    filling the preallocated distance, hit point and hit flag arrays. Runs without the GIL.
+    Rays that hit nothing get their length as distance and NaN as point.
+    '''
+    _check_batch_shapes(origins, ends, wall_starts, wall_ends, out_distances, out_points, out_hits)
+
+    cdef Py_ssize_t ray_count = origins.shape[0]
+    cdef Py_ssize_t wall_count = wall_starts.shape[0]
+    cdef Py_ssize_t i, j
+    cdef double t, closest_t
+
+    with nogil:
+        for i in range(ray_count):
+            closest_t = 2
+            for j in range(wall_count):
+                t = _ray_wall_intersection(
+                    origins[i, 0], origins[i, 1], ends[i, 0], ends[i, 1],
+                    wall_starts[j, 0], wall_starts[j, 1], wall_ends[j, 0], wall_ends[j, 1])
+                if t >= 0 and t < closest_t:
+                    closest_t = t
+            _store_closest_hit(i, closest_t, origins, ends, out_distances, out_points, out_hits)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def cast_rays_batch_indexed(const double[:, ::1] origins, const double[:, ::1] ends, const double[:, ::1] wall_starts, const double[:, ::1] wall_ends, const long long[:, ::1] candidate_walls, Py_ssize_t rays_per_row, double[::1] out_distances, double[:, ::1] out_points, unsigned char[::1] out_hits):
+    '''
+    Like cast_rays_batch, but ray i is only tested against the walls listed in
+    row i // rays_per_row of candidate_walls. Negative indices are padding and skipped.
+    '''
+    _check_batch_shapes(origins, ends, wall_starts, wall_ends, out_distances, out_points, out_hits)
+    if rays_per_row < 1 or candidate_walls.shape[0] * rays_per_row < origins.shape[0]:
+        raise ValueError("Every ray needs a row of candidate walls")
+
+    cdef Py_ssize_t ray_count = origins.shape[0]
+    cdef Py_ssize_t wall_count = wall_starts.shape[0]
+    cdef Py_ssize_t candidate_count = candidate_walls.shape[1]
+    cdef Py_ssize_t i, k, row
+    cdef long long j
+    cdef double t, closest_t
+
+    with nogil:
+        for i in range(ray_count):
+            closest_t = 2
+            row = i // rays_per_row
+            for k in range(candidate_count):
+                j = candidate_walls[row, k]
+                if j < 0 or j >= wall_count:
+                    continue
+                t = _ray_wall_intersection(
+                    origins[i, 0], origins[i, 1], ends[i, 0], ends[i, 1],
+                    wall_starts[j, 0], wall_starts[j, 1], wall_ends[j, 0], wall_ends[j, 1])
+                if t >= 0 and t < closest_t:
+                    closest_t = t
+            _store_closest_hit(i, closest_t, origins, ends, out_distances, out_points, out_hits)